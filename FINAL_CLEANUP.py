@@ -4,7 +4,7 @@ Removes all unnecessary documentation and keeps only essential files
 """
 
 import os
-from pathlib import Path
+import stat
 
 # DOCUMENTATION FILES TO DELETE (keep only essential ones)
 docs_to_delete = [
@@ -46,19 +46,37 @@ print()
 deleted_count = 0
 total_size = 0
 
+# One pass over the directory: DirEntry caches the file type and size, and
+# scanning, stat and unlink all resolve names against one open directory fd
+targets = frozenset(docs_to_delete)
+results = {}
+use_dir_fd = os.unlink in os.supports_dir_fd and os.scandir in os.supports_fd
+dirfd = os.open('.', os.O_RDONLY | os.O_DIRECTORY) if use_dir_fd else None
+try:
+    with os.scandir('.' if dirfd is None else dirfd) as entries:
+        for entry in entries:
+            if entry.name not in targets or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+                os.unlink(entry.name, dir_fd=dirfd)
+                results[entry.name] = size
+            except OSError as e:
+                results[entry.name] = e
+finally:
+    if dirfd is not None:
+        os.close(dirfd)
+
 for filename in docs_to_delete:
-    filepath = Path(filename)
-    if filepath.exists():
-        try:
-            size = filepath.stat().st_size
-            filepath.unlink()
-            print(f"✅ Deleted: {filename} ({size/1024:.1f} KB)")
-            deleted_count += 1
-            total_size += size
-        except Exception as e:
-            print(f"❌ Error: {filename} - {e}")
-    else:
+    result = results.get(filename)
+    if result is None:
         print(f"⏭️  Not found: {filename}")
+    elif isinstance(result, OSError):
+        print(f"❌ Error: {filename} - {result}")
+    else:
+        print(f"✅ Deleted: {filename} ({result/1024:.1f} KB)")
+        deleted_count += 1
+        total_size += result
 
 print()
 print("=" * 70)
@@ -101,11 +119,14 @@ essential_files = [
 ]
 
 for filename, description in essential_files:
-    if Path(filename).exists():
-        size = Path(filename).stat().st_size if Path(filename).is_file() else 0
-        print(f"✅ {filename:<35} - {description}")
-    else:
+    # One lstat answers exists / is-file / size together
+    try:
+        st = os.lstat(filename)
+    except FileNotFoundError:
         print(f"⚠️  {filename:<35} - NOT FOUND")
+        continue
+    size = st.st_size if stat.S_ISREG(st.st_mode) else 0
+    print(f"✅ {filename:<35} - {description}")
 
 print()
 print("=" * 70)
@@ -4,9 +4,262 @@ Comprehensive financial metrics for any business type
 Fixed NPV, IRR, and added profit/loss ratio calculations
 """
 
+import bisect
+from functools import lru_cache
 import numpy as np
-from typing import Dict, List, Union, Optional
-from scipy.optimize import fsolve
+import pandas as pd
+from typing import Dict, List, NamedTuple, Union, Optional, Tuple
+
+
+# Interpretation lookup tables: sorted band thresholds and one label per band.
+# "< x" ladders are looked up with bisect_right, "> x" ladders with bisect_left.
+_WACC_THRESHOLDS = (0.08, 0.12)
+_WACC_TEXTS = (
+    "Low cost of capital - favorable for investments",
+    "Moderate cost of capital - typical range",
+    "High cost of capital - projects need higher returns",
+)
+_EBITDA_THRESHOLDS = (0, 10, 20)
+_EBITDA_TEXTS = (
+    "Negative EBITDA - operational losses",
+    "Positive but low EBITDA margin",
+    "Healthy EBITDA margin",
+    "Strong operational profitability",
+)
+_OCF_THRESHOLDS = (0.5, 1)
+_OCF_TEXTS = (
+    "Weak - may struggle to meet current obligations",
+    "Adequate - reasonable cash flow coverage",
+    "Strong - can cover current liabilities with operating cash flow",
+)
+_ASSET_TURNOVER_THRESHOLDS = (0.5, 1, 2)
+_ASSET_TURNOVER_TEXTS = (
+    "Low - underutilizing assets",
+    "Moderate - average asset efficiency",
+    "Good - efficient use of assets",
+    "Excellent - highly efficient asset utilization",
+)
+_INVENTORY_THRESHOLDS = (5, 10)
+_INVENTORY_TEXTS = ('Needs Improvement', 'Good', 'Excellent')
+_LIQUIDITY_THRESHOLDS = (1, 1.5)
+_LIQUIDITY_TEXTS = ('Concerning', 'Adequate', 'Healthy')
+_LEVERAGE_THRESHOLDS = (1, 2)
+_LEVERAGE_TEXTS = ('Conservative', 'Moderate', 'High')
+_LEVERAGE_LEVELS = ('low', 'moderate', 'high')
+
+_NPV_FORMULA = 'NPV = Σ [CFt / (1 + r)^t]'
+
+
+# Numeric cores: plain float/ndarray in, compact NamedTuples out. The
+# calculator methods below only wrap these results into dicts.
+
+class _NPVParts(NamedTuple):
+    npv: float
+    present_values: np.ndarray
+
+
+class _WACCParts(NamedTuple):
+    wacc: float
+    total_capital: float
+    equity_weight: float
+    debt_weight: float
+    after_tax_cost_of_debt: float
+
+
+class _EBITDAParts(NamedTuple):
+    ebitda: float
+    ebitda_margin: float
+
+
+class _BreakEvenParts(NamedTuple):
+    contribution_margin: float
+    break_even_units: float
+    break_even_revenue: float
+
+
+def _safe_ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """
+    Elementwise num / den, 0 where den <= 0 (the scalar methods' guard), without
+    branching per element: non-positive denominators are swapped for 1 before
+    the divide, so no inf/NaN is produced and then masked.
+    """
+    positive = den > 0
+    return np.where(positive, num / np.where(positive, den, 1.0), 0.0)
+
+
+@lru_cache(maxsize=32)
+def _discount_exponents(periods: int) -> np.ndarray:
+    """Read-only [0, -1, ..., -(periods-1)] as float64, the discounting powers."""
+    exponents = -np.arange(periods, dtype=np.float64)
+    exponents.setflags(write=False)
+    return exponents
+
+
+@lru_cache(maxsize=64)
+def _discount_factors(periods: int, rate: float) -> np.ndarray:
+    """
+    Read-only (1+r)^-t for t = 0..periods-1. Cached per (periods, rate): the
+    same rate is applied again and again (the default 10% in calculate_all_metrics,
+    every Streamlit rerun), so those calls reduce to one multiply by the cash flows.
+    """
+    factors = np.power(1.0 + rate, _discount_exponents(periods))
+    factors.setflags(write=False)
+    return factors
+
+
+def _npv_core(cf: np.ndarray, rate: float) -> _NPVParts:
+    """NPV and per-period present values for an array of cash flows."""
+    present_values = cf * _discount_factors(cf.size, float(rate))
+    return _NPVParts(float(present_values.sum()), present_values)
+
+
+def _npv_horner(coeffs: np.ndarray, rate: float) -> float:
+    """
+    NPV only (no per-period values) by Horner's rule in x = 1/(1+r):
+    one multiply-add per cash flow, no pow. coeffs are the cash flows reversed.
+    """
+    return np.polyval(coeffs, 1.0 / (1.0 + rate))
+
+
+# Above this many periods the O(n^3) eigenvalue solve in _irr_roots gets
+# slower than iterating, so long series go through Newton instead.
+_IRR_ROOTS_MAX_PERIODS = 200
+
+# |NPV(irr)| must be within this fraction of Σ|CFt| for a rate to be reported
+_IRR_NPV_RTOL = 1e-6
+
+
+def _irr_roots(cf: np.ndarray, guess: float) -> Optional[float]:
+    """
+    Enumerate every real IRR from the roots of Σ CFt·x^t (x = 1/(1+r)) and
+    return the one closest to guess, or None if there is no real root.
+    """
+    roots = np.roots(cf[::-1])
+    real = roots[np.abs(roots.imag) < 1e-9].real
+    real = real[real > 0]  # x > 0  <=>  r > -1
+    if real.size == 0:
+        return None
+    rates = 1.0 / real - 1.0
+    return float(rates[np.argmin(np.abs(rates - guess))])
+
+
+def _npv_and_slope(cf: np.ndarray, rate: float, out: Optional[np.ndarray] = None) -> Tuple[float, float]:
+    """
+    NPV and dNPV/dr at one rate from a single set of present values:
+    dNPV/dr = -Σ t·CFt·(1+r)^-(t+1). Both are whole-array ufunc/dot calls,
+    where np.polyval with a scalar x loops over the coefficients in Python.
+    out is an optional scratch array of cf's size for the present values.
+    """
+    exponents = _discount_exponents(cf.size)
+    present_values = np.power(1.0 + rate, exponents, out=out)
+    present_values *= cf
+    return float(present_values.sum()), float(exponents @ present_values) / (1.0 + rate)
+
+
+def _irr_newton(cf: np.ndarray, guess: float, tol: float = 1e-9, max_iter: int = 100) -> Optional[float]:
+    """
+    Damped Newton's method on NPV(r).
+    Returns None if the iteration does not converge to a root.
+    """
+    rate = guess
+    # A rate only counts as the IRR if it actually zeroes the NPV
+    npv_tol = _IRR_NPV_RTOL * float(np.abs(cf).sum())
+    # Every NPV evaluation in the solve writes its present values into one buffer
+    scratch = np.empty_like(cf)
+    with np.errstate(over='ignore', invalid='ignore'):
+        f, fp = _npv_and_slope(cf, rate, scratch)
+        for _ in range(max_iter):
+            if fp == 0 or not np.isfinite(fp):
+                return None
+            
+            # Halve the step until it stays above -1 and reduces |NPV|;
+            # a full step overshoots badly on long, convex NPV curves
+            step = f / fp
+            accepted = False
+            while abs(step) >= tol:
+                new_rate = rate - step
+                if new_rate > -1:
+                    new_f, new_fp = _npv_and_slope(cf, new_rate, scratch)
+                    if np.isfinite(new_f) and abs(new_f) <= abs(f):
+                        accepted = True
+                        break
+                step /= 2
+            
+            # Either the step vanished without the line search accepting
+            # anything, or it did and the iterate stopped moving: stop here
+            if not accepted:
+                return float(rate) if abs(f) <= npv_tol else None
+            if abs(new_rate - rate) < tol:
+                return float(new_rate) if abs(new_f) <= npv_tol else None
+            rate, f, fp = new_rate, new_f, new_fp
+    return None
+
+
+def _irr_fallback(cashflows: np.ndarray) -> Optional[float]:
+    """
+    IRR for cash flows where Newton did not converge: numpy-financial first,
+    then a bracketed Brent search. SciPy is only imported on this path.
+    """
+    try:
+        import numpy_financial as npf
+        irr = float(npf.irr(cashflows))
+        if np.isfinite(irr):
+            return irr
+    except ImportError:
+        pass
+    
+    try:
+        from scipy.optimize import brentq
+        cf = np.asarray(cashflows, dtype=np.float64)
+        if not cf.any():
+            return None
+        scratch = np.empty_like(cf)
+        with np.errstate(over='ignore', invalid='ignore'):
+            return float(brentq(lambda rate: _npv_and_slope(cf, rate, scratch)[0], -0.999, 10.0))
+    except (ImportError, ValueError):
+        return None
+
+
+def _wacc_core(equity: float, debt: float, cost_of_equity: float,
+               cost_of_debt: float, tax_rate: float) -> _WACCParts:
+    """WACC, capital weights and after-tax cost of debt; total capital must be non-zero."""
+    total_capital = equity + debt
+    equity_weight = equity / total_capital
+    debt_weight = debt / total_capital
+    after_tax_cost_of_debt = cost_of_debt * (1 - tax_rate)
+    wacc = (equity_weight * cost_of_equity) + (debt_weight * after_tax_cost_of_debt)
+    return _WACCParts(wacc, total_capital, equity_weight, debt_weight, after_tax_cost_of_debt)
+
+
+def _ebitda_core(revenue: float, operating_expenses: float,
+                 depreciation: float, amortization: float) -> _EBITDAParts:
+    """EBITDA and EBITDA margin in percent."""
+    ebitda = revenue - operating_expenses + depreciation + amortization
+    ebitda_margin = (ebitda / revenue * 100) if revenue > 0 else 0
+    return _EBITDAParts(ebitda, ebitda_margin)
+
+
+def _break_even_core(fixed_costs: float, price_per_unit: float,
+                     variable_cost_per_unit: float) -> _BreakEvenParts:
+    """Contribution margin and break-even units/revenue."""
+    contribution_margin = price_per_unit - variable_cost_per_unit
+    break_even_units = fixed_costs / contribution_margin if contribution_margin > 0 else 0
+    return _BreakEvenParts(contribution_margin, break_even_units, break_even_units * price_per_unit)
+
+
+def round_result(result: Dict, ndigits: int = 4) -> Dict:
+    """
+    Round the float values of a metric result for display or export.
+    Calculations keep full precision; rounding happens only at the edges.
+    """
+    rounded = {}
+    for key, value in result.items():
+        if isinstance(value, float):
+            value = round(value, ndigits)
+        elif isinstance(value, list):
+            value = [round(v, ndigits) if isinstance(v, float) else v for v in value]
+        rounded[key] = value
+    return rounded
 
 
 class AdvancedFinancialCalculator:
@@ -16,58 +269,77 @@ class AdvancedFinancialCalculator:
     """
     
     @staticmethod
-    def calculate_profit_loss_ratio(revenue: float, cost: float) -> Dict:
+    def calculate_profit_loss_ratio(revenue: Union[float, np.ndarray], cost: Union[float, np.ndarray]) -> Dict:
         """
         Calculate Profit/Loss Ratio and related metrics.
+        Arrays of revenues and costs give arrays for the numeric fields and status
+        (no per-row interpretation text), computed without a per-element branch.
         """
-        try:
+        if np.ndim(revenue) or np.ndim(cost):
+            revenue = np.asarray(revenue, dtype=np.float64)
+            cost = np.asarray(cost, dtype=np.float64)
             profit = revenue - cost
-            profit_loss_ratio = profit / revenue if revenue > 0 else 0
-            
+            profit_loss_ratio = _safe_ratio(profit, revenue)
             return {
-                'profit': round(profit, 4),
-                'revenue': round(revenue, 4),
-                'cost': round(cost, 4),
-                'profit_loss_ratio': round(profit_loss_ratio, 4),
-                'profit_percentage': round(profit_loss_ratio * 100, 2),
+                'profit': profit,
+                'revenue': revenue,
+                'cost': cost,
+                'profit_loss_ratio': profit_loss_ratio,
+                'profit_percentage': profit_loss_ratio * 100,
                 'is_profitable': profit > 0,
-                'status': 'Profitable' if profit > 0 else 'Loss',
-                'interpretation': f"{'Profit' if profit > 0 else 'Loss'} of {abs(profit):,.2f} ({abs(profit_loss_ratio)*100:.2f}%)",
+                'status': np.where(profit > 0, 'Profitable', 'Loss'),
                 'formula': 'Profit/Loss Ratio = (Revenue - Cost) / Revenue'
             }
-        except Exception as e:
-            return {'error': str(e)}
+        
+        profit = revenue - cost
+        profit_loss_ratio = profit / revenue if revenue > 0 else 0
+        return AdvancedFinancialCalculator._profit_loss_from(revenue, cost, profit, profit_loss_ratio)
+    
+    @staticmethod
+    def _profit_loss_from(revenue: float, cost: float, profit: float, profit_loss_ratio: float) -> Dict:
+        """Build the profit/loss result from precomputed profit and ratio."""
+        return {
+            'profit': profit,
+            'revenue': revenue,
+            'cost': cost,
+            'profit_loss_ratio': profit_loss_ratio,
+            'profit_percentage': profit_loss_ratio * 100,
+            'is_profitable': profit > 0,
+            'status': 'Profitable' if profit > 0 else 'Loss',
+            'interpretation': f"{'Profit' if profit > 0 else 'Loss'} of {abs(profit):,.2f} ({abs(profit_loss_ratio)*100:.2f}%)",
+            'formula': 'Profit/Loss Ratio = (Revenue - Cost) / Revenue'
+        }
     
     @staticmethod
     def calculate_npv_fixed(cashflows: List[float], discount_rate: float) -> Dict:
         """
         Calculate NPV (Net Present Value) - FIXED VERSION.
-        Handles any list of cash flows correctly.
+        Handles any list or array of cash flows correctly.
         """
         try:
-            if not cashflows or len(cashflows) == 0:
-                return {'error': 'No cash flows provided'}
-            
-            # Calculate NPV
-            npv = 0
-            for t, cf in enumerate(cashflows):
-                npv += cf / ((1 + discount_rate) ** t)
-            
-            # Calculate present values for each period
-            present_values = [cf / ((1 + discount_rate) ** t) for t, cf in enumerate(cashflows)]
-            
-            return {
-                'npv': round(npv, 4),
-                'discount_rate': round(discount_rate, 4),
-                'periods': len(cashflows),
-                'total_cashflow': round(sum(cashflows), 4),
-                'present_values': [round(pv, 4) for pv in present_values],
-                'decision': 'Accept Project' if npv > 0 else 'Reject Project',
-                'interpretation': f"NPV of {npv:,.4f} indicates project {'adds' if npv > 0 else 'destroys'} value",
-                'formula': 'NPV = Σ [CFt / (1 + r)^t]'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+            cf = np.asarray(cashflows, dtype=np.float64)
+            discount_rate = float(discount_rate)
+        except (TypeError, ValueError) as e:
+            return {'error': f'Cash flows and discount rate must be numeric: {e}'}
+        if cf.size == 0:
+            return {'error': 'No cash flows provided'}
+        if discount_rate <= -1:
+            return {'error': 'Discount rate must be greater than -100%'}
+        
+        npv, present_values = _npv_core(cf, discount_rate)
+        
+        # A literal with constant keys compiles to a single BUILD_CONST_KEY_MAP,
+        # about twice as fast as dict(zip(keys, values))
+        return {
+            'npv': npv,
+            'discount_rate': discount_rate,
+            'periods': cf.size,
+            'total_cashflow': float(cf.sum()),
+            'present_values': present_values.tolist(),
+            'decision': 'Accept Project' if npv > 0 else 'Reject Project',
+            'interpretation': f"NPV of {npv:,.4f} indicates project {'adds' if npv > 0 else 'destroys'} value",
+            'formula': _NPV_FORMULA
+        }
     
     @staticmethod
     def calculate_irr_fixed(cashflows: List[float], guess: float = 0.1) -> Dict:
@@ -76,253 +348,276 @@ class AdvancedFinancialCalculator:
         Uses numerical methods for accurate calculation.
         """
         try:
-            if not cashflows or len(cashflows) < 2:
-                return {'error': 'At least 2 cash flows required'}
-            
-            # Define NPV function for IRR calculation
-            def npv_func(rate):
-                return sum([cf / ((1 + rate) ** t) for t, cf in enumerate(cashflows)])
-            
-            # Solve for IRR
-            try:
-                irr = fsolve(npv_func, guess)[0]
-            except:
-                # Fallback to numpy if scipy fails
-                try:
-                    irr = np.irr(cashflows)
-                except:
-                    return {'error': 'Could not calculate IRR - cash flows may be invalid'}
-            
-            return {
-                'irr': round(irr, 4),
-                'irr_percentage': round(irr * 100, 2),
-                'periods': len(cashflows),
-                'total_cashflow': round(sum(cashflows), 4),
-                'interpretation': f"IRR of {irr*100:.2f}% indicates {'good' if irr > 0.1 else 'poor'} return",
-                'recommendation': 'Invest' if irr > 0.1 else 'Reconsider',
-                'formula': 'IRR: Rate where NPV = 0'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+            cf = np.asarray(cashflows, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            return {'error': f'Cash flows must be numeric: {e}'}
+        if cf.size < 2:
+            return {'error': 'At least 2 cash flows required'}
+        
+        # NPV can only cross zero if the cash flows change sign; answer the
+        # degenerate cases without running any solver
+        if not (cf > 0).any() or not (cf < 0).any():
+            if not cf.any():
+                return {'error': 'Could not calculate IRR - all cash flows are zero'}
+            return {'error': 'Could not calculate IRR - cash flows never change sign'}
+        
+        # One sign change means exactly one IRR (Descartes' rule of signs), so
+        # Newton lands on the root np.roots would pick without the eigenvalue solve
+        signs = np.sign(cf[cf != 0])
+        single_root = np.count_nonzero(signs[1:] != signs[:-1]) == 1
+        
+        irr = None
+        if single_root or cf.size > _IRR_ROOTS_MAX_PERIODS:
+            irr = _irr_newton(cf, guess)
+        if irr is None and cf.size <= _IRR_ROOTS_MAX_PERIODS:
+            irr = _irr_roots(cf, guess)
+        
+        if irr is None:
+            irr = _irr_fallback(cf)
+            if irr is not None:
+                with np.errstate(over='ignore', invalid='ignore'):
+                    residual = _npv_and_slope(cf, irr)[0]
+                if not abs(residual) <= _IRR_NPV_RTOL * float(np.abs(cf).sum()):
+                    irr = None
+            if irr is None:
+                return {'error': 'Could not calculate IRR - cash flows may be invalid'}
+        
+        return {
+            'irr': irr,
+            'irr_percentage': irr * 100,
+            'periods': cf.size,
+            'total_cashflow': float(cf.sum()),
+            'interpretation': f"IRR of {irr*100:.2f}% indicates {'good' if irr > 0.1 else 'poor'} return",
+            'recommendation': 'Invest' if irr > 0.1 else 'Reconsider',
+            'formula': 'IRR: Rate where NPV = 0'
+        }
+    
+    @staticmethod
+    def calculate_npv_profile(cashflows: List[float], discount_rates: List[float]) -> Dict:
+        """
+        NPV of the same cash flows at many discount rates in one call, for
+        sensitivity tables and NPV-profile charts. Each rate is a Horner
+        evaluation of the cash flow polynomial; no per-period values are kept.
+        """
+        try:
+            cf = np.asarray(cashflows, dtype=np.float64)
+            rates = np.asarray(discount_rates, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            return {'error': f'Cash flows and discount rates must be numeric: {e}'}
+        if cf.size == 0:
+            return {'error': 'No cash flows provided'}
+        if (rates <= -1).any():
+            return {'error': 'Discount rates must be greater than -100%'}
+        
+        npv = _npv_horner(cf[::-1], rates)
+        
+        return {
+            'discount_rates': rates.tolist(),
+            'npv': npv.tolist(),
+            'periods': cf.size,
+            'formula': _NPV_FORMULA
+        }
     
     @staticmethod
     def calculate_roi(total_revenue: float, total_cost: float, investment: float) -> Dict:
         """Calculate Return on Investment."""
-        try:
-            net_profit = total_revenue - total_cost
-            roi = (net_profit / investment) if investment > 0 else 0
-            
-            return {
-                'roi': round(roi, 4),
-                'roi_percentage': round(roi * 100, 2),
-                'net_profit': round(net_profit, 4),
-                'investment': round(investment, 4),
-                'interpretation': f"ROI of {roi*100:.2f}% on investment of {investment:,.2f}",
-                'formula': 'ROI = (Revenue - Cost) / Investment'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        return AdvancedFinancialCalculator._roi_from(total_revenue - total_cost, investment)
+    
+    @staticmethod
+    def _roi_from(net_profit: float, investment: float) -> Dict:
+        """Build the ROI result from a precomputed net profit."""
+        roi = (net_profit / investment) if investment > 0 else 0
+        
+        return {
+            'roi': roi,
+            'roi_percentage': roi * 100,
+            'net_profit': net_profit,
+            'investment': investment,
+            'interpretation': f"ROI of {roi*100:.2f}% on investment of {investment:,.2f}",
+            'formula': 'ROI = (Revenue - Cost) / Investment'
+        }
     
     @staticmethod
     def calculate_break_even(fixed_costs: float, price_per_unit: float, variable_cost_per_unit: float) -> Dict:
         """Calculate Break-Even Analysis."""
-        try:
-            contribution_margin = price_per_unit - variable_cost_per_unit
-            break_even_units = fixed_costs / contribution_margin if contribution_margin > 0 else 0
-            break_even_revenue = break_even_units * price_per_unit
-            
-            return {
-                'break_even_units': round(break_even_units, 2),
-                'break_even_revenue': round(break_even_revenue, 2),
-                'contribution_margin': round(contribution_margin, 4),
-                'contribution_margin_ratio': round(contribution_margin / price_per_unit, 4) if price_per_unit > 0 else 0,
-                'interpretation': f"Need to sell {break_even_units:.0f} units to break even",
-                'formula': 'Break-Even = Fixed Costs / (Price - Variable Cost)'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        contribution_margin, break_even_units, break_even_revenue = _break_even_core(
+            fixed_costs, price_per_unit, variable_cost_per_unit
+        )
+        
+        return {
+            'break_even_units': break_even_units,
+            'break_even_revenue': break_even_revenue,
+            'contribution_margin': contribution_margin,
+            'contribution_margin_ratio': contribution_margin / price_per_unit if price_per_unit > 0 else 0,
+            'interpretation': f"Need to sell {break_even_units:.0f} units to break even",
+            'formula': 'Break-Even = Fixed Costs / (Price - Variable Cost)'
+        }
     
     @staticmethod
     def calculate_gross_margin(revenue: float, cogs: float) -> Dict:
         """Calculate Gross Margin."""
-        try:
-            gross_profit = revenue - cogs
-            gross_margin = (gross_profit / revenue) if revenue > 0 else 0
-            
-            return {
-                'gross_profit': round(gross_profit, 4),
-                'gross_margin': round(gross_margin, 4),
-                'gross_margin_percentage': round(gross_margin * 100, 2),
-                'interpretation': f"Gross margin of {gross_margin*100:.2f}% indicates {'healthy' if gross_margin > 0.3 else 'low'} profitability",
-                'formula': 'Gross Margin = (Revenue - COGS) / Revenue'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        gross_profit = revenue - cogs
+        gross_margin = (gross_profit / revenue) if revenue > 0 else 0
+        return AdvancedFinancialCalculator._gross_margin_from(gross_profit, gross_margin)
+    
+    @staticmethod
+    def _gross_margin_from(gross_profit: float, gross_margin: float) -> Dict:
+        """Build the gross margin result from precomputed profit and margin."""
+        return {
+            'gross_profit': gross_profit,
+            'gross_margin': gross_margin,
+            'gross_margin_percentage': gross_margin * 100,
+            'interpretation': f"Gross margin of {gross_margin*100:.2f}% indicates {'healthy' if gross_margin > 0.3 else 'low'} profitability",
+            'formula': 'Gross Margin = (Revenue - COGS) / Revenue'
+        }
     
     @staticmethod
     def calculate_net_margin(revenue: float, total_costs: float) -> Dict:
         """Calculate Net Profit Margin."""
-        try:
-            net_profit = revenue - total_costs
-            net_margin = (net_profit / revenue) if revenue > 0 else 0
-            
-            return {
-                'net_profit': round(net_profit, 4),
-                'net_margin': round(net_margin, 4),
-                'net_margin_percentage': round(net_margin * 100, 2),
-                'interpretation': f"Net margin of {net_margin*100:.2f}% shows overall profitability",
-                'formula': 'Net Margin = (Revenue - Total Costs) / Revenue'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        net_profit = revenue - total_costs
+        net_margin = (net_profit / revenue) if revenue > 0 else 0
+        return AdvancedFinancialCalculator._net_margin_from(net_profit, net_margin)
+    
+    @staticmethod
+    def _net_margin_from(net_profit: float, net_margin: float) -> Dict:
+        """Build the net margin result from precomputed profit and margin."""
+        return {
+            'net_profit': net_profit,
+            'net_margin': net_margin,
+            'net_margin_percentage': net_margin * 100,
+            'interpretation': f"Net margin of {net_margin*100:.2f}% shows overall profitability",
+            'formula': 'Net Margin = (Revenue - Total Costs) / Revenue'
+        }
     
     @staticmethod
     def calculate_working_capital(current_assets: float, current_liabilities: float) -> Dict:
         """Calculate Working Capital metrics."""
-        try:
-            working_capital = current_assets - current_liabilities
-            current_ratio = current_assets / current_liabilities if current_liabilities > 0 else 0
-            
-            return {
-                'working_capital': round(working_capital, 4),
-                'current_ratio': round(current_ratio, 4),
-                'current_assets': round(current_assets, 4),
-                'current_liabilities': round(current_liabilities, 4),
-                'liquidity_status': 'Healthy' if current_ratio > 1.5 else 'Adequate' if current_ratio > 1 else 'Concerning',
-                'interpretation': f"Working capital of {working_capital:,.2f} with current ratio of {current_ratio:.2f}",
-                'formula': 'Working Capital = Current Assets - Current Liabilities'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        working_capital = current_assets - current_liabilities
+        current_ratio = current_assets / current_liabilities if current_liabilities > 0 else 0
+        
+        return {
+            'working_capital': working_capital,
+            'current_ratio': current_ratio,
+            'current_assets': current_assets,
+            'current_liabilities': current_liabilities,
+            'liquidity_status': _LIQUIDITY_TEXTS[bisect.bisect_left(_LIQUIDITY_THRESHOLDS, current_ratio)],
+            'interpretation': f"Working capital of {working_capital:,.2f} with current ratio of {current_ratio:.2f}",
+            'formula': 'Working Capital = Current Assets - Current Liabilities'
+        }
     
     @staticmethod
     def calculate_debt_to_equity(total_debt: float, total_equity: float) -> Dict:
         """Calculate Debt-to-Equity Ratio."""
-        try:
-            de_ratio = total_debt / total_equity if total_equity > 0 else 0
-            
-            return {
-                'debt_to_equity': round(de_ratio, 4),
-                'total_debt': round(total_debt, 4),
-                'total_equity': round(total_equity, 4),
-                'leverage': 'High' if de_ratio > 2 else 'Moderate' if de_ratio > 1 else 'Conservative',
-                'interpretation': f"D/E ratio of {de_ratio:.2f} indicates {'high' if de_ratio > 2 else 'moderate' if de_ratio > 1 else 'low'} leverage",
-                'formula': 'D/E Ratio = Total Debt / Total Equity'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        de_ratio = total_debt / total_equity if total_equity > 0 else 0
+        band = bisect.bisect_left(_LEVERAGE_THRESHOLDS, de_ratio)
+        
+        return {
+            'debt_to_equity': de_ratio,
+            'total_debt': total_debt,
+            'total_equity': total_equity,
+            'leverage': _LEVERAGE_TEXTS[band],
+            'interpretation': f"D/E ratio of {de_ratio:.2f} indicates {_LEVERAGE_LEVELS[band]} leverage",
+            'formula': 'D/E Ratio = Total Debt / Total Equity'
+        }
     
     @staticmethod
     def calculate_inventory_turnover(cogs: float, average_inventory: float) -> Dict:
         """Calculate Inventory Turnover."""
-        try:
-            turnover = cogs / average_inventory if average_inventory > 0 else 0
-            days_inventory = 365 / turnover if turnover > 0 else 0
-            
-            return {
-                'inventory_turnover': round(turnover, 4),
-                'days_inventory_outstanding': round(days_inventory, 2),
-                'cogs': round(cogs, 4),
-                'average_inventory': round(average_inventory, 4),
-                'efficiency': 'Excellent' if turnover > 10 else 'Good' if turnover > 5 else 'Needs Improvement',
-                'interpretation': f"Inventory turns over {turnover:.2f} times per year ({days_inventory:.0f} days)",
-                'formula': 'Inventory Turnover = COGS / Average Inventory'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        turnover = cogs / average_inventory if average_inventory > 0 else 0
+        days_inventory = 365 / turnover if turnover > 0 else 0
+        
+        return {
+            'inventory_turnover': turnover,
+            'days_inventory_outstanding': days_inventory,
+            'cogs': cogs,
+            'average_inventory': average_inventory,
+            'efficiency': _INVENTORY_TEXTS[bisect.bisect_left(_INVENTORY_THRESHOLDS, turnover)],
+            'interpretation': f"Inventory turns over {turnover:.2f} times per year ({days_inventory:.0f} days)",
+            'formula': 'Inventory Turnover = COGS / Average Inventory'
+        }
     
     @staticmethod
     def calculate_revenue_per_hour(total_revenue: float, total_hours: float) -> Dict:
         """Calculate Revenue per Hour (for service businesses)."""
-        try:
-            rph = total_revenue / total_hours if total_hours > 0 else 0
-            
-            return {
-                'revenue_per_hour': round(rph, 4),
-                'total_revenue': round(total_revenue, 4),
-                'total_hours': round(total_hours, 2),
-                'daily_revenue': round(rph * 8, 2),
-                'monthly_revenue': round(rph * 160, 2),
-                'interpretation': f"Generating {rph:,.2f} per hour",
-                'formula': 'Revenue per Hour = Total Revenue / Total Hours'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        rph = total_revenue / total_hours if total_hours > 0 else 0
+        
+        return {
+            'revenue_per_hour': rph,
+            'total_revenue': total_revenue,
+            'total_hours': total_hours,
+            'daily_revenue': rph * 8,
+            'monthly_revenue': rph * 160,
+            'interpretation': f"Generating {rph:,.2f} per hour",
+            'formula': 'Revenue per Hour = Total Revenue / Total Hours'
+        }
     
     @staticmethod
     def calculate_sales_growth(current_sales: float, previous_sales: float) -> Dict:
         """Calculate Sales Growth Rate."""
-        try:
-            growth = ((current_sales - previous_sales) / previous_sales) if previous_sales > 0 else 0
-            
-            return {
-                'sales_growth': round(growth, 4),
-                'sales_growth_percentage': round(growth * 100, 2),
-                'current_sales': round(current_sales, 4),
-                'previous_sales': round(previous_sales, 4),
-                'trend': 'Growing' if growth > 0 else 'Declining',
-                'interpretation': f"Sales {'grew' if growth > 0 else 'declined'} by {abs(growth)*100:.2f}%",
-                'formula': 'Sales Growth = (Current - Previous) / Previous'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        growth = ((current_sales - previous_sales) / previous_sales) if previous_sales > 0 else 0
+        
+        return {
+            'sales_growth': growth,
+            'sales_growth_percentage': growth * 100,
+            'current_sales': current_sales,
+            'previous_sales': previous_sales,
+            'trend': 'Growing' if growth > 0 else 'Declining',
+            'interpretation': f"Sales {'grew' if growth > 0 else 'declined'} by {abs(growth)*100:.2f}%",
+            'formula': 'Sales Growth = (Current - Previous) / Previous'
+        }
     
     @staticmethod
     def calculate_payback_period(initial_investment: float, annual_cashflow: float) -> Dict:
         """Calculate Payback Period."""
-        try:
-            payback = initial_investment / annual_cashflow if annual_cashflow > 0 else 0
-            
-            return {
-                'payback_period_years': round(payback, 2),
-                'payback_period_months': round(payback * 12, 1),
-                'initial_investment': round(initial_investment, 4),
-                'annual_cashflow': round(annual_cashflow, 4),
-                'attractiveness': 'Attractive' if payback < 3 else 'Acceptable' if payback < 5 else 'Risky',
-                'interpretation': f"Investment pays back in {payback:.2f} years",
-                'formula': 'Payback Period = Initial Investment / Annual Cash Flow'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        payback = initial_investment / annual_cashflow if annual_cashflow > 0 else 0
+        
+        return {
+            'payback_period_years': payback,
+            'payback_period_months': payback * 12,
+            'initial_investment': initial_investment,
+            'annual_cashflow': annual_cashflow,
+            'attractiveness': 'Attractive' if payback < 3 else 'Acceptable' if payback < 5 else 'Risky',
+            'interpretation': f"Investment pays back in {payback:.2f} years",
+            'formula': 'Payback Period = Initial Investment / Annual Cash Flow'
+        }
     
     @staticmethod
     def calculate_profitability_index(npv: float, initial_investment: float) -> Dict:
         """Calculate Profitability Index."""
-        try:
-            pv_future_cashflows = npv + initial_investment
-            pi = pv_future_cashflows / initial_investment if initial_investment > 0 else 0
-            
-            return {
-                'profitability_index': round(pi, 4),
-                'npv': round(npv, 4),
-                'initial_investment': round(initial_investment, 4),
-                'decision': 'Accept' if pi > 1 else 'Reject',
-                'interpretation': f"PI of {pi:.2f} indicates project {'creates' if pi > 1 else 'destroys'} value",
-                'formula': 'PI = (NPV + Initial Investment) / Initial Investment'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        pv_future_cashflows = npv + initial_investment
+        pi = pv_future_cashflows / initial_investment if initial_investment > 0 else 0
+        
+        return {
+            'profitability_index': pi,
+            'npv': npv,
+            'initial_investment': initial_investment,
+            'decision': 'Accept' if pi > 1 else 'Reject',
+            'interpretation': f"PI of {pi:.2f} indicates project {'creates' if pi > 1 else 'destroys'} value",
+            'formula': 'PI = (NPV + Initial Investment) / Initial Investment'
+        }
     
     @staticmethod
     def calculate_cash_flow_analysis(revenue: float, expenses: float, initial_cash: float = 0) -> Dict:
         """Calculate comprehensive Cash Flow Analysis."""
-        try:
-            net_cashflow = revenue - expenses
-            ending_cash = initial_cash + net_cashflow
-            cashflow_margin = (net_cashflow / revenue) if revenue > 0 else 0
-            
-            return {
-                'net_cashflow': round(net_cashflow, 4),
-                'initial_cash': round(initial_cash, 4),
-                'ending_cash': round(ending_cash, 4),
-                'cashflow_margin': round(cashflow_margin, 4),
-                'cashflow_margin_percentage': round(cashflow_margin * 100, 2),
-                'status': 'Positive' if net_cashflow > 0 else 'Negative',
-                'interpretation': f"{'Positive' if net_cashflow > 0 else 'Negative'} cash flow of {abs(net_cashflow):,.2f}",
-                'formula': 'Net Cash Flow = Revenue - Expenses'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        net_cashflow = revenue - expenses
+        cashflow_margin = (net_cashflow / revenue) if revenue > 0 else 0
+        return AdvancedFinancialCalculator._cash_flow_from(net_cashflow, cashflow_margin, initial_cash)
+    
+    @staticmethod
+    def _cash_flow_from(net_cashflow: float, cashflow_margin: float, initial_cash: float = 0) -> Dict:
+        """Build the cash flow result from precomputed net cash flow and margin."""
+        ending_cash = initial_cash + net_cashflow
+        
+        return {
+            'net_cashflow': net_cashflow,
+            'initial_cash': initial_cash,
+            'ending_cash': ending_cash,
+            'cashflow_margin': cashflow_margin,
+            'cashflow_margin_percentage': cashflow_margin * 100,
+            'status': 'Positive' if net_cashflow > 0 else 'Negative',
+            'interpretation': f"{'Positive' if net_cashflow > 0 else 'Negative'} cash flow of {abs(net_cashflow):,.2f}",
+            'formula': 'Net Cash Flow = Revenue - Expenses'
+        }
     
     @staticmethod
     def calculate_all_metrics(financial_data: Dict) -> Dict:
@@ -330,101 +625,80 @@ class AdvancedFinancialCalculator:
         Calculate all applicable metrics based on available data.
         Automatically selects and calculates relevant metrics.
         """
-        results = {}
+        # Bitmask of the input fields that are present
+        present = 0
+        for bit, key in enumerate(_FIELDS):
+            present |= (key in financial_data) << bit
         
-        # Profit/Loss Ratio
-        if 'revenue' in financial_data and 'cost' in financial_data:
-            results['profit_loss'] = AdvancedFinancialCalculator.calculate_profit_loss_ratio(
-                financial_data['revenue']['total'],
-                financial_data['cost']['total']
-            )
+        # Shared income-statement figures and the cash flow array, read and
+        # converted once for every metric; metrics that need a missing field
+        # are skipped by the bitmask below
+        revenue = financial_data.get('revenue', {}).get('total', 0.0)
+        cost = financial_data.get('cost', {}).get('total', 0.0)
+        profit = revenue - cost
+        cashflows = np.asarray(financial_data.get('cashflows', ()), dtype=np.float64)
+        shared = _SharedFigures(revenue, cost, profit, profit / revenue if revenue > 0 else 0, cashflows)
         
-        # ROI
-        if 'revenue' in financial_data and 'cost' in financial_data and 'investment' in financial_data:
-            results['roi'] = AdvancedFinancialCalculator.calculate_roi(
-                financial_data['revenue']['total'],
-                financial_data['cost']['total'],
-                financial_data['investment']
-            )
+        results = {}
+        for name, need, metric in _METRICS:
+            if present & need == need:
+                results[name] = metric(financial_data, shared)
         
-        # NPV and IRR
-        if 'cashflows' in financial_data:
-            results['npv'] = AdvancedFinancialCalculator.calculate_npv_fixed(
-                financial_data['cashflows'],
-                0.10  # Default 10% discount rate
-            )
-            results['irr'] = AdvancedFinancialCalculator.calculate_irr_fixed(
-                financial_data['cashflows']
-            )
+        return results
+    
+    @staticmethod
+    def calculate_all_metrics_batch(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized calculate_all_metrics for many rows at once (e.g. one row per deal).
         
-        # Margins
-        if 'revenue' in financial_data and 'cost' in financial_data:
-            results['gross_margin'] = AdvancedFinancialCalculator.calculate_gross_margin(
-                financial_data['revenue']['total'],
-                financial_data['cost']['total']
-            )
-            results['net_margin'] = AdvancedFinancialCalculator.calculate_net_margin(
-                financial_data['revenue']['total'],
-                financial_data['cost']['total']
-            )
+        Expects numeric columns named like the financial_data keys: 'revenue',
+        'cost' and optionally 'investment', 'assets', 'liabilities', 'equity'.
+        Returns one row per input row with the scalar metrics that the
+        available columns allow; zero denominators give 0 like the scalar methods.
+        """
+        def col(name):
+            return df[name].to_numpy(dtype=np.float64)
         
-        # Working Capital
-        if 'assets' in financial_data and 'liabilities' in financial_data:
-            results['working_capital'] = AdvancedFinancialCalculator.calculate_working_capital(
-                financial_data['assets'],
-                financial_data['liabilities']
-            )
+        out = {}
+        has = set(df.columns)
         
-        # Debt-to-Equity
-        if 'liabilities' in financial_data and 'equity' in financial_data:
-            results['debt_to_equity'] = AdvancedFinancialCalculator.calculate_debt_to_equity(
-                financial_data['liabilities'],
-                financial_data['equity']
-            )
+        if {'revenue', 'cost'} <= has:
+            revenue, cost = col('revenue'), col('cost')
+            profit = revenue - cost
+            margin = _safe_ratio(profit, revenue)
+            out['profit'] = profit
+            out['profit_loss_ratio'] = margin
+            out['profit_percentage'] = margin * 100
+            out['gross_margin'] = margin
+            out['net_margin'] = margin
+            out['cashflow_margin'] = margin
+            out['ebitda'] = profit
+            out['ebitda_margin'] = margin * 100
+            if 'investment' in has:
+                out['roi'] = _safe_ratio(profit, col('investment'))
         
-        # Inventory Turnover
-        if 'cost' in financial_data and 'assets' in financial_data:
-            results['inventory_turnover'] = AdvancedFinancialCalculator.calculate_inventory_turnover(
-                financial_data['cost']['total'],
-                financial_data['assets']
-            )
+        if {'assets', 'liabilities'} <= has:
+            assets, liabilities = col('assets'), col('liabilities')
+            out['working_capital'] = assets - liabilities
+            out['current_ratio'] = _safe_ratio(assets, liabilities)
         
-        # Cash Flow Analysis
-        if 'revenue' in financial_data and 'cost' in financial_data:
-            results['cashflow_analysis'] = AdvancedFinancialCalculator.calculate_cash_flow_analysis(
-                financial_data['revenue']['total'],
-                financial_data['cost']['total']
-            )
+        if {'liabilities', 'equity'} <= has:
+            liabilities, equity = col('liabilities'), col('equity')
+            out['debt_to_equity'] = _safe_ratio(liabilities, equity)
+            # Same default capital costs as calculate_all_metrics
+            with np.errstate(divide='ignore', invalid='ignore'):
+                wacc = _wacc_core(equity, liabilities, 0.12, 0.06, 0.30).wacc
+            out['wacc'] = np.where((equity > 0) & (liabilities > 0), wacc, np.nan)
         
-        # WACC (Weighted Average Cost of Capital)
-        if 'equity' in financial_data and 'liabilities' in financial_data:
-            # Ensure we have valid numeric values
-            equity_val = financial_data.get('equity', 0)
-            debt_val = financial_data.get('liabilities', 0)
-            
-            if equity_val > 0 and debt_val > 0:
-                results['wacc'] = AdvancedFinancialCalculator.calculate_wacc(
-                    equity=equity_val,
-                    debt=debt_val,
-                    cost_of_equity=0.12,  # Default 12%
-                    cost_of_debt=0.06,    # Default 6%
-                    tax_rate=0.30         # Default 30%
-                )
-            else:
-                results['wacc'] = {'error': 'Need positive Equity and Liabilities/Debt values for WACC calculation'}
-        
-        # EBITDA
-        if 'revenue' in financial_data and 'cost' in financial_data:
-            results['ebitda'] = AdvancedFinancialCalculator.calculate_ebitda(
-                revenue=financial_data['revenue']['total'],
-                operating_expenses=financial_data['cost']['total']
-            )
+        if {'cost', 'assets'} <= has:
+            out['inventory_turnover'] = _safe_ratio(col('cost'), col('assets'))
         
-        return results
+        return pd.DataFrame(out, index=df.index)
     
     @staticmethod
-    def calculate_wacc(equity: float, debt: float, cost_of_equity: float, 
-                       cost_of_debt: float, tax_rate: float) -> Dict:
+    def calculate_wacc(equity: Union[float, np.ndarray], debt: Union[float, np.ndarray],
+                       cost_of_equity: Union[float, np.ndarray], cost_of_debt: Union[float, np.ndarray],
+                       tax_rate: Union[float, np.ndarray]) -> Dict:
         """
         Calculate WACC (Weighted Average Cost of Capital).
         
@@ -436,45 +710,52 @@ class AdvancedFinancialCalculator:
         - Re = Cost of equity
         - Rd = Cost of debt
         - T = Tax rate
+        
+        Any argument may be an array (e.g. a grid of costs of equity and tax
+        rates for sensitivity analysis); they broadcast together and every
+        field comes back as an array, with NaN where total capital is zero.
         """
-        try:
-            total_capital = equity + debt
-            
-            if total_capital == 0:
+        args = (equity, debt, cost_of_equity, cost_of_debt, tax_rate)
+        if any(np.ndim(arg) for arg in args):
+            equity, debt, cost_of_equity, cost_of_debt, tax_rate = np.broadcast_arrays(
+                *(np.asarray(arg, dtype=np.float64) for arg in args)
+            )
+            with np.errstate(divide='ignore', invalid='ignore'):
+                wacc, total_capital, equity_weight, debt_weight, after_tax_cost_of_debt = _wacc_core(
+                    equity, debt, cost_of_equity, cost_of_debt, tax_rate
+                )
+            no_capital = total_capital == 0
+            wacc = np.where(no_capital, np.nan, wacc)
+            interpretation = np.where(
+                no_capital, 'Total capital (Equity + Debt) is zero',
+                np.asarray(_WACC_TEXTS)[np.searchsorted(_WACC_THRESHOLDS, wacc, side='right')]
+            )
+        else:
+            if equity + debt == 0:
                 return {'error': 'Total capital (Equity + Debt) is zero'}
             
-            equity_weight = equity / total_capital
-            debt_weight = debt / total_capital
-            
-            # WACC calculation
-            wacc = (equity_weight * cost_of_equity) + (debt_weight * cost_of_debt * (1 - tax_rate))
-            
-            interpretation = ""
-            if wacc < 0.08:
-                interpretation = "Low cost of capital - favorable for investments"
-            elif wacc < 0.12:
-                interpretation = "Moderate cost of capital - typical range"
-            else:
-                interpretation = "High cost of capital - projects need higher returns"
+            wacc, total_capital, equity_weight, debt_weight, after_tax_cost_of_debt = _wacc_core(
+                equity, debt, cost_of_equity, cost_of_debt, tax_rate
+            )
             
-            return {
-                'wacc': round(wacc, 4),
-                'wacc_percentage': round(wacc * 100, 2),
-                'equity': round(equity, 2),
-                'debt': round(debt, 2),
-                'total_capital': round(total_capital, 2),
-                'equity_weight': round(equity_weight, 4),
-                'debt_weight': round(debt_weight, 4),
-                'cost_of_equity': round(cost_of_equity, 4),
-                'cost_of_debt': round(cost_of_debt, 4),
-                'tax_rate': round(tax_rate, 4),
-                'after_tax_cost_of_debt': round(cost_of_debt * (1 - tax_rate), 4),
-                'interpretation': interpretation,
-                'formula': 'WACC = (E/V × Re) + (D/V × Rd × (1 - T))',
-                'recommendation': 'Use WACC as discount rate for NPV calculations'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+            interpretation = _WACC_TEXTS[bisect.bisect_right(_WACC_THRESHOLDS, wacc)]
+        
+        return {
+            'wacc': wacc,
+            'wacc_percentage': wacc * 100,
+            'equity': equity,
+            'debt': debt,
+            'total_capital': total_capital,
+            'equity_weight': equity_weight,
+            'debt_weight': debt_weight,
+            'cost_of_equity': cost_of_equity,
+            'cost_of_debt': cost_of_debt,
+            'tax_rate': tax_rate,
+            'after_tax_cost_of_debt': after_tax_cost_of_debt,
+            'interpretation': interpretation,
+            'formula': 'WACC = (E/V × Re) + (D/V × Rd × (1 - T))',
+            'recommendation': 'Use WACC as discount rate for NPV calculations'
+        }
     
     @staticmethod
     def calculate_ebitda(revenue: float, operating_expenses: float, 
@@ -484,33 +765,28 @@ class AdvancedFinancialCalculator:
         
         Formula: EBITDA = Revenue - Operating Expenses + Depreciation + Amortization
         """
-        try:
-            ebitda = revenue - operating_expenses + depreciation + amortization
-            ebitda_margin = (ebitda / revenue * 100) if revenue > 0 else 0
-            
-            interpretation = ""
-            if ebitda_margin > 20:
-                interpretation = "Strong operational profitability"
-            elif ebitda_margin > 10:
-                interpretation = "Healthy EBITDA margin"
-            elif ebitda_margin > 0:
-                interpretation = "Positive but low EBITDA margin"
-            else:
-                interpretation = "Negative EBITDA - operational losses"
-            
-            return {
-                'ebitda': round(ebitda, 2),
-                'revenue': round(revenue, 2),
-                'operating_expenses': round(operating_expenses, 2),
-                'depreciation': round(depreciation, 2),
-                'amortization': round(amortization, 2),
-                'ebitda_margin': round(ebitda_margin, 2),
-                'interpretation': interpretation,
-                'formula': 'EBITDA = Revenue - Operating Expenses + D&A',
-                'status': 'Positive' if ebitda > 0 else 'Negative'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        ebitda, ebitda_margin = _ebitda_core(revenue, operating_expenses, depreciation, amortization)
+        return AdvancedFinancialCalculator._ebitda_from(
+            revenue, operating_expenses, depreciation, amortization, ebitda, ebitda_margin
+        )
+    
+    @staticmethod
+    def _ebitda_from(revenue: float, operating_expenses: float, depreciation: float,
+                     amortization: float, ebitda: float, ebitda_margin: float) -> Dict:
+        """Build the EBITDA result from precomputed EBITDA and margin."""
+        interpretation = _EBITDA_TEXTS[bisect.bisect_left(_EBITDA_THRESHOLDS, ebitda_margin)]
+        
+        return {
+            'ebitda': ebitda,
+            'revenue': revenue,
+            'operating_expenses': operating_expenses,
+            'depreciation': depreciation,
+            'amortization': amortization,
+            'ebitda_margin': ebitda_margin,
+            'interpretation': interpretation,
+            'formula': 'EBITDA = Revenue - Operating Expenses + D&A',
+            'status': 'Positive' if ebitda > 0 else 'Negative'
+        }
     
     @staticmethod
     def calculate_operating_cash_flow_ratio(operating_cashflow: float, 
@@ -520,30 +796,21 @@ class AdvancedFinancialCalculator:
         
         Formula: Operating Cash Flow Ratio = Operating Cash Flow / Current Liabilities
         """
-        try:
-            if current_liabilities == 0:
-                return {'error': 'Current liabilities cannot be zero'}
-            
-            ratio = operating_cashflow / current_liabilities
-            
-            interpretation = ""
-            if ratio > 1:
-                interpretation = "Strong - can cover current liabilities with operating cash flow"
-            elif ratio > 0.5:
-                interpretation = "Adequate - reasonable cash flow coverage"
-            else:
-                interpretation = "Weak - may struggle to meet current obligations"
-            
-            return {
-                'operating_cashflow_ratio': round(ratio, 4),
-                'operating_cashflow': round(operating_cashflow, 2),
-                'current_liabilities': round(current_liabilities, 2),
-                'interpretation': interpretation,
-                'formula': 'OCF Ratio = Operating Cash Flow / Current Liabilities',
-                'benchmark': 'Ratio > 1 is considered healthy'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        if current_liabilities == 0:
+            return {'error': 'Current liabilities cannot be zero'}
+        
+        ratio = operating_cashflow / current_liabilities
+        
+        interpretation = _OCF_TEXTS[bisect.bisect_left(_OCF_THRESHOLDS, ratio)]
+        
+        return {
+            'operating_cashflow_ratio': ratio,
+            'operating_cashflow': operating_cashflow,
+            'current_liabilities': current_liabilities,
+            'interpretation': interpretation,
+            'formula': 'OCF Ratio = Operating Cash Flow / Current Liabilities',
+            'benchmark': 'Ratio > 1 is considered healthy'
+        }
     
     @staticmethod
     def calculate_asset_turnover(revenue: float, total_assets: float) -> Dict:
@@ -552,29 +819,75 @@ class AdvancedFinancialCalculator:
         
         Formula: Asset Turnover = Revenue / Total Assets
         """
-        try:
-            if total_assets == 0:
-                return {'error': 'Total assets cannot be zero'}
-            
-            ratio = revenue / total_assets
-            
-            interpretation = ""
-            if ratio > 2:
-                interpretation = "Excellent - highly efficient asset utilization"
-            elif ratio > 1:
-                interpretation = "Good - efficient use of assets"
-            elif ratio > 0.5:
-                interpretation = "Moderate - average asset efficiency"
-            else:
-                interpretation = "Low - underutilizing assets"
-            
-            return {
-                'asset_turnover': round(ratio, 4),
-                'revenue': round(revenue, 2),
-                'total_assets': round(total_assets, 2),
-                'interpretation': interpretation,
-                'formula': 'Asset Turnover = Revenue / Total Assets',
-                'benchmark': 'Higher ratio indicates better asset efficiency'
-            }
-        except Exception as e:
-            return {'error': str(e)}
+        if total_assets == 0:
+            return {'error': 'Total assets cannot be zero'}
+        
+        ratio = revenue / total_assets
+        
+        interpretation = _ASSET_TURNOVER_TEXTS[bisect.bisect_left(_ASSET_TURNOVER_THRESHOLDS, ratio)]
+        
+        return {
+            'asset_turnover': ratio,
+            'revenue': revenue,
+            'total_assets': total_assets,
+            'interpretation': interpretation,
+            'formula': 'Asset Turnover = Revenue / Total Assets',
+            'benchmark': 'Higher ratio indicates better asset efficiency'
+        }
+
+
+# Dispatch table for calculate_all_metrics. Each entry is
+# (result key, required field bits, metric(financial_data, shared figures)).
+_FIELDS = ('revenue', 'cost', 'investment', 'cashflows', 'assets', 'liabilities', 'equity')
+_REVENUE, _COST, _INVESTMENT, _CASHFLOWS, _ASSETS, _LIABILITIES, _EQUITY = (1 << i for i in range(len(_FIELDS)))
+_PL = _REVENUE | _COST
+
+
+class _SharedFigures(NamedTuple):
+    revenue: float
+    cost: float
+    profit: float
+    margin: float
+    cashflows: np.ndarray
+
+
+def _wacc_metric(financial_data: Dict, shared: _SharedFigures) -> Dict:
+    equity_val = financial_data['equity']
+    debt_val = financial_data['liabilities']
+    if equity_val > 0 and debt_val > 0:
+        return AdvancedFinancialCalculator.calculate_wacc(
+            equity=equity_val,
+            debt=debt_val,
+            cost_of_equity=0.12,  # Default 12%
+            cost_of_debt=0.06,    # Default 6%
+            tax_rate=0.30         # Default 30%
+        )
+    return {'error': 'Need positive Equity and Liabilities/Debt values for WACC calculation'}
+
+
+_calc = AdvancedFinancialCalculator
+_METRICS = (
+    ('profit_loss', _PL,
+     lambda fd, pl: _calc._profit_loss_from(pl.revenue, pl.cost, pl.profit, pl.margin)),
+    ('roi', _PL | _INVESTMENT,
+     lambda fd, pl: _calc._roi_from(pl.profit, fd['investment'])),
+    ('npv', _CASHFLOWS,
+     lambda fd, pl: _calc.calculate_npv_fixed(pl.cashflows, 0.10)),  # Default 10% discount rate
+    ('irr', _CASHFLOWS,
+     lambda fd, pl: _calc.calculate_irr_fixed(pl.cashflows)),
+    ('gross_margin', _PL,
+     lambda fd, pl: _calc._gross_margin_from(pl.profit, pl.margin)),
+    ('net_margin', _PL,
+     lambda fd, pl: _calc._net_margin_from(pl.profit, pl.margin)),
+    ('working_capital', _ASSETS | _LIABILITIES,
+     lambda fd, pl: _calc.calculate_working_capital(fd['assets'], fd['liabilities'])),
+    ('debt_to_equity', _LIABILITIES | _EQUITY,
+     lambda fd, pl: _calc.calculate_debt_to_equity(fd['liabilities'], fd['equity'])),
+    ('inventory_turnover', _COST | _ASSETS,
+     lambda fd, pl: _calc.calculate_inventory_turnover(pl.cost, fd['assets'])),
+    ('cashflow_analysis', _PL,
+     lambda fd, pl: _calc._cash_flow_from(pl.profit, pl.margin)),
+    ('wacc', _EQUITY | _LIABILITIES, _wacc_metric),
+    ('ebitda', _PL,
+     lambda fd, pl: _calc._ebitda_from(pl.revenue, pl.cost, 0, 0, pl.profit, pl.margin * 100)),
+)
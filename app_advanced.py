@@ -6,16 +6,18 @@ Full automation with LLM integration for any business dataset
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
+from itertools import zip_longest
 from pathlib import Path
+import io
+import re
 import sys
 
 # Import custom modules
-from smart_analyzer import SmartFinancialAnalyzer, auto_detect_and_calculate
-from advanced_calculator import AdvancedFinancialCalculator
-from llm_integration import generate_ai_insights
+from smart_analyzer import SmartFinancialAnalyzer, auto_detect_and_calculate, parse_dates_strict
+from advanced_calculator import AdvancedFinancialCalculator, round_result
+# plotly and llm_integration are imported where they are first used, so a
+# fresh session renders the upload page without paying for those imports
 
 # Page configuration
 st.set_page_config(
@@ -102,6 +104,16 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# xlsxwriter writes workbooks considerably faster than openpyxl. Its
+# constant_memory mode is not used: pandas writes cells column by column,
+# and constant_memory only accepts row-by-row writes.
+try:
+    import xlsxwriter  # noqa: F401
+    EXCEL_EXPORT_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_EXPORT_ENGINE = 'openpyxl'
+
+
 def display_header():
     """Display application header."""
     st.markdown('<div class="main-header">🤖AI Financial Analysis Platform</div>', unsafe_allow_html=True)
@@ -109,6 +121,176 @@ def display_header():
     st.markdown("---")
 
 
+def read_csv_fast(source):
+    """
+    Read a CSV (raw bytes or a path) with Polars' multi-threaded reader.
+    Paths go through the lazy scanner, which reads the file directly
+    instead of through a Python file object.
+    Falls back to pandas if Polars is not installed or rejects the file.
+    """
+    try:
+        import polars as pl
+        if isinstance(source, bytes):
+            return pl.read_csv(source, infer_schema_length=1000).to_pandas()
+        return pl.scan_csv(source, infer_schema_length=1000).collect().to_pandas()
+    except Exception:
+        return pd.read_csv(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def read_excel_fast(source):
+    """
+    Read an Excel workbook with the Rust calamine reader (pandas >= 2.2).
+    Falls back to openpyxl if python-calamine is not installed.
+    Text columns are stored Arrow-backed instead of as Python str objects.
+    """
+    try:
+        df = pd.read_excel(source, engine='calamine')
+    except ImportError:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        df = pd.read_excel(source, engine='openpyxl')
+    
+    # Numeric columns stay NumPy for the calculator and charts
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+
+def read_parquet_fast(path):
+    """
+    Read a Parquet file through Polars' lazy scanner.
+    Falls back to pandas if Polars is not installed.
+    """
+    try:
+        import polars as pl
+    except ImportError:
+        return pd.read_parquet(path)
+    return pl.scan_parquet(path).collect().to_pandas()
+
+
+SAMPLE_XLSX = Path('data/Hackathon/Inputs/ABC_Book_Stores_Inventory_Register.xlsx')
+SAMPLE_PARQUET = SAMPLE_XLSX.with_suffix('.parquet')
+
+
+def sample_dataset_path():
+    """
+    Path of the sample dataset, preferring a Parquet copy of the Excel file.
+    The copy is written on first use so later loads skip openpyxl's XML parsing.
+    """
+    if SAMPLE_PARQUET.exists() and (not SAMPLE_XLSX.exists() or
+                                    SAMPLE_PARQUET.stat().st_mtime >= SAMPLE_XLSX.stat().st_mtime):
+        return SAMPLE_PARQUET
+    if not SAMPLE_XLSX.exists():
+        return None
+    try:
+        read_excel_fast(SAMPLE_XLSX).to_parquet(SAMPLE_PARQUET, compression='snappy')
+        return SAMPLE_PARQUET
+    except Exception:
+        return SAMPLE_XLSX
+
+
+# Cache keys for uploaded files: xxh3 hashes the raw bytes far faster than
+# Streamlit's default MD5; fall back to the default if xxhash is missing
+try:
+    import xxhash
+    UPLOAD_HASH_FUNCS = {bytes: xxhash.xxh3_64_intdigest}
+except ImportError:
+    UPLOAD_HASH_FUNCS = None
+
+
+@st.cache_data(show_spinner=False, max_entries=8, hash_funcs=UPLOAD_HASH_FUNCS)
+def load_uploaded_file(file_bytes: bytes, file_name: str):
+    """
+    Parse and analyze an uploaded file.
+    Cached on the raw bytes and name, so widget reruns skip parsing and analysis.
+    """
+    # Read file based on extension
+    file_extension = file_name.split('.')[-1].lower()
+    
+    if file_extension == 'csv':
+        try:
+            df = read_csv_fast(file_bytes)
+        except Exception as e:
+            return None, None, f"Failed to read CSV file: {str(e)}. File may be corrupted."
+    elif file_extension in ['xlsx', 'xls']:
+        try:
+            df = read_excel_fast(io.BytesIO(file_bytes))
+        except Exception as e:
+            return None, None, f"Failed to read Excel file: {str(e)}. File may be corrupted or password-protected."
+    else:
+        return None, None, f"Unsupported file format: .{file_extension}. Please upload CSV or Excel files."
+    
+    return process_dataframe(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_local_file(file_path: str, modified: float):
+    """
+    Parse and analyze a file on disk (e.g. the sample dataset).
+    Cached on the path and modification time, so reruns skip parsing and analysis.
+    """
+    try:
+        if file_path.endswith('.csv'):
+            df = read_csv_fast(file_path)
+        elif file_path.endswith('.parquet'):
+            df = read_parquet_fast(file_path)
+        else:
+            df = read_excel_fast(file_path)
+    except Exception as e:
+        return None, None, f"Failed to read file: {str(e)}"
+    
+    return process_dataframe(df)
+
+
+DATE_COLUMN_PATTERN = re.compile(r'date|time|period|month|year', re.IGNORECASE)
+
+
+def process_dataframe(df):
+    """
+    Validate a loaded DataFrame and run automatic analysis on it.
+    Handles datetime columns and ensures only numeric data is used for calculations.
+    """
+    # Validate dataframe
+    if df is None or df.empty:
+        return None, None, "File is empty or contains no data"
+    
+    # Clean column names
+    df.columns = [c.strip() if isinstance(c, str) else c for c in df.columns]
+    
+    # Parse text date columns once here, but only when a sample of the column
+    # fits an explicit format; labels such as 'Jan' or 'Q1' stay as text
+    for col in df.columns:
+        if (isinstance(col, str) and DATE_COLUMN_PATTERN.search(col)
+                and df[col].dtype.kind not in 'iufcmM'):
+            parsed = parse_dates_strict(df[col])
+            if parsed is not None:
+                df[col] = parsed
+    
+    # Check if we have at least some numeric columns; keep the list for the dashboard.
+    # Reading dtype.kind off df.dtypes skips select_dtypes' sub-frame and Index.
+    numeric_cols = [col for col, dtype in df.dtypes.items() if dtype.kind in 'iufc']
+    if not numeric_cols:
+        return None, None, "No numeric columns found in dataset. Please ensure your file contains financial data with numbers."
+    df.attrs['numeric_cols'] = numeric_cols
+    
+    # Halve int64 columns to int32 when the values leave headroom for column
+    # arithmetic (e.g. revenue - cost). Floats stay float64: totals are summed
+    # in the column dtype and float32 would drop paise on large sums.
+    for col in numeric_cols:
+        series = df[col]
+        if series.dtype == np.int64 and -2**30 < series.min() and series.max() < 2**30:
+            df[col] = series.astype(np.int32)
+    
+    # Automatic analysis (handles datetime columns internally)
+    try:
+        analysis_result = auto_detect_and_calculate(df)
+    except Exception as e:
+        return None, None, f"Error analyzing dataset: {str(e)}"
+    
+    return df, analysis_result, None
+
+
 def load_and_process_file(uploaded_file=None, file_path=None):
     """
     Load and process any CSV/Excel file with smart detection.
@@ -116,61 +298,33 @@ def load_and_process_file(uploaded_file=None, file_path=None):
     """
     try:
         if uploaded_file is not None:
-            # Read file based on extension
-            file_extension = uploaded_file.name.split('.')[-1].lower()
-            
-            if file_extension == 'csv':
-                try:
-                    df = pd.read_csv(uploaded_file)
-                except Exception as e:
-                    return None, None, f"Failed to read CSV file: {str(e)}. File may be corrupted."
-            elif file_extension in ['xlsx', 'xls']:
-                try:
-                    df = pd.read_excel(uploaded_file, engine='openpyxl')
-                except Exception as e:
-                    return None, None, f"Failed to read Excel file: {str(e)}. File may be corrupted or password-protected."
-            else:
-                return None, None, f"Unsupported file format: .{file_extension}. Please upload CSV or Excel files."
+            return load_uploaded_file(uploaded_file.getvalue(), uploaded_file.name)
         
         elif file_path is not None:
             if not Path(file_path).exists():
                 return None, None, f"File not found: {file_path}"
             
-            try:
-                if file_path.endswith('.csv'):
-                    df = pd.read_csv(file_path)
-                else:
-                    df = pd.read_excel(file_path, engine='openpyxl')
-            except Exception as e:
-                return None, None, f"Failed to read file: {str(e)}"
+            return load_local_file(file_path, Path(file_path).stat().st_mtime)
         
         else:
             return None, None, "No file provided"
-        
-        # Validate dataframe
-        if df is None or df.empty:
-            return None, None, "File is empty or contains no data"
-        
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        
-        # Check if we have at least some numeric columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) == 0:
-            return None, None, "No numeric columns found in dataset. Please ensure your file contains financial data with numbers."
-        
-        # Automatic analysis (handles datetime columns internally)
-        try:
-            analysis_result = auto_detect_and_calculate(df)
-        except Exception as e:
-            return None, None, f"Error analyzing dataset: {str(e)}"
-        
-        return df, analysis_result, None
     
     except Exception as e:
         return None, None, f"Error processing file: {str(e)}"
 
 
+@st.cache_resource
+def get_calculator():
+    """Single calculator instance shared across reruns and sessions."""
+    return AdvancedFinancialCalculator()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def calculate_metrics(financial_data):
+    """All metrics for the extracted financial data, memoized across reruns."""
+    return get_calculator().calculate_all_metrics(financial_data)
+
+
 def display_business_detection(analysis):
     """Display business type detection results."""
     st.subheader("🔍 Automatic Business Intelligence")
@@ -217,6 +371,112 @@ def display_business_detection(analysis):
             st.markdown(f"- {rec}")
 
 
+@st.cache_resource
+def plotly_go():
+    """
+    plotly.graph_objects, imported on first use with the app's chart defaults
+    registered once as a template layered on Plotly's own.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    
+    pio.templates['zenalyst'] = go.layout.Template(layout=dict(height=350))
+    pio.templates.default = 'plotly+zenalyst'
+    return go
+
+
+# Metric charts are cached on the handful of numbers they plot, so reruns
+# with unchanged metrics reuse the built figure instead of rebuilding it
+
+@st.cache_data(show_spinner=False)
+def profit_loss_chart(revenue, cost, profit):
+    """Grouped bar chart of revenue, costs and profit."""
+    go = plotly_go()
+    
+    fig = go.Figure(data=[
+        go.Bar(name='Revenue', x=['Financial Performance'], y=[revenue], marker_color='green'),
+        go.Bar(name='Costs', x=['Financial Performance'], y=[cost], marker_color='red'),
+        go.Bar(name='Profit', x=['Financial Performance'], y=[profit], marker_color='blue')
+    ])
+    fig.update_layout(title='Revenue vs Costs vs Profit', height=400)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def npv_chart(present_values):
+    """Bar chart of present value per period."""
+    go = plotly_go()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=list(range(len(present_values))),
+        y=present_values,
+        name='Present Values',
+        marker_color='lightblue'
+    ))
+    fig.update_layout(
+        title='NPV Cash Flow Analysis by Period',
+        xaxis_title='Period',
+        yaxis_title='Present Value (₹)',
+        height=400
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def liquidity_chart(current_assets, current_liabilities):
+    """Bar chart of current assets against current liabilities."""
+    go = plotly_go()
+    
+    fig = go.Figure(data=[
+        go.Bar(name='Current Assets', x=['Liquidity'], y=[current_assets], marker_color='green'),
+        go.Bar(name='Current Liabilities', x=['Liquidity'], y=[current_liabilities], marker_color='orange')
+    ])
+    fig.update_layout(title='Current Assets vs Liabilities')
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def capital_structure_chart(total_debt, total_equity):
+    """Donut chart of debt vs equity."""
+    go = plotly_go()
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=['Debt', 'Equity'],
+        values=[total_debt, total_equity],
+        hole=.3
+    )])
+    fig.update_layout(title='Capital Structure')
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def wacc_chart(equity_component, debt_component):
+    """Donut chart of the equity and after-tax debt WACC components."""
+    go = plotly_go()
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=['Equity Component', 'Debt Component (After-Tax)'],
+        values=[equity_component, debt_component],
+        hole=.4
+    )])
+    fig.update_layout(title='WACC Components')
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def ebitda_chart(ebitda, operating_expenses):
+    """Grouped bar chart of EBITDA against operating expenses."""
+    go = plotly_go()
+    
+    fig = go.Figure(data=[
+        go.Bar(name='EBITDA', x=['Performance'], y=[ebitda], marker_color='lightblue'),
+        go.Bar(name='Operating Expenses', x=['Performance'], y=[operating_expenses], marker_color='coral')
+    ])
+    fig.update_layout(title='EBITDA vs Operating Expenses')
+    return fig
+
+
 def display_financial_metrics(metrics_results):
     """Display all calculated financial metrics."""
     st.subheader("📈 Automated Financial Metrics")
@@ -244,17 +504,7 @@ def display_financial_metrics(metrics_results):
                 st.metric("Status", status)
             
             # Profit/Loss Chart
-            fig = go.Figure(data=[
-                go.Bar(name='Revenue', x=['Financial Performance'], y=[pl['revenue']], marker_color='green'),
-                go.Bar(name='Costs', x=['Financial Performance'], y=[pl['cost']], marker_color='red'),
-                go.Bar(name='Profit', x=['Financial Performance'], y=[pl['profit']], marker_color='blue')
-            ])
-            fig.update_layout(
-                title='Revenue vs Costs vs Profit',
-                barmode='group',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(profit_loss_chart(pl['revenue'], pl['cost'], pl['profit']), use_container_width=True)
             
             st.info(f"**Interpretation:** {pl['interpretation']}")
     
@@ -302,23 +552,7 @@ def display_financial_metrics(metrics_results):
         
         # NPV Cash Flow Chart
         if 'npv' in metrics_results and 'present_values' in metrics_results['npv']:
-            npv = metrics_results['npv']
-            periods = list(range(len(npv['present_values'])))
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=periods,
-                y=npv['present_values'],
-                name='Present Values',
-                marker_color='lightblue'
-            ))
-            fig.update_layout(
-                title='NPV Cash Flow Analysis by Period',
-                xaxis_title='Period',
-                yaxis_title='Present Value (₹)',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(npv_chart(metrics_results['npv']['present_values']), use_container_width=True)
     
     # Tab 4: Margins
     with tabs[3]:
@@ -356,12 +590,7 @@ def display_financial_metrics(metrics_results):
             st.info(f"**Analysis:** {wc['interpretation']}")
             
             # Liquidity Chart
-            fig = go.Figure(data=[
-                go.Bar(name='Current Assets', x=['Liquidity'], y=[wc['current_assets']], marker_color='green'),
-                go.Bar(name='Current Liabilities', x=['Liquidity'], y=[wc['current_liabilities']], marker_color='orange')
-            ])
-            fig.update_layout(title='Current Assets vs Liabilities', height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(liquidity_chart(wc['current_assets'], wc['current_liabilities']), use_container_width=True)
     
     # Tab 6: Leverage
     with tabs[5]:
@@ -379,13 +608,7 @@ def display_financial_metrics(metrics_results):
             st.info(f"**Analysis:** {de['interpretation']}")
             
             # Leverage Pie Chart
-            fig = go.Figure(data=[go.Pie(
-                labels=['Debt', 'Equity'],
-                values=[de['total_debt'], de['total_equity']],
-                hole=.3
-            )])
-            fig.update_layout(title='Capital Structure', height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(capital_structure_chart(de['total_debt'], de['total_equity']), use_container_width=True)
     
     # Tab 7: Efficiency
     with tabs[6]:
@@ -436,16 +659,9 @@ def display_financial_metrics(metrics_results):
                 st.success(f"💡 **{wacc['recommendation']}**")
                 
                 # WACC Visualization
-                fig = go.Figure(data=[go.Pie(
-                    labels=['Equity Component', 'Debt Component (After-Tax)'],
-                    values=[
-                        wacc['equity_weight'] * wacc['cost_of_equity'],
-                        wacc['debt_weight'] * wacc['after_tax_cost_of_debt']
-                    ],
-                    hole=.4
-                )])
-                fig.update_layout(title='WACC Components', height=350)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(wacc_chart(wacc['equity_weight'] * wacc['cost_of_equity'],
+                                           wacc['debt_weight'] * wacc['after_tax_cost_of_debt']),
+                                use_container_width=True)
         
         st.markdown("---")
         
@@ -468,12 +684,7 @@ def display_financial_metrics(metrics_results):
                 st.info(f"**Analysis:** {ebitda['interpretation']}")
                 
                 # EBITDA Chart
-                fig = go.Figure(data=[
-                    go.Bar(name='EBITDA', x=['Performance'], y=[ebitda['ebitda']], marker_color='lightblue'),
-                    go.Bar(name='Operating Expenses', x=['Performance'], y=[ebitda['operating_expenses']], marker_color='coral')
-                ])
-                fig.update_layout(title='EBITDA vs Operating Expenses', barmode='group', height=350)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(ebitda_chart(ebitda['ebitda'], ebitda['operating_expenses']), use_container_width=True)
         
         # Show if no advanced metrics available
         if 'wacc' not in metrics_results and 'ebitda' not in metrics_results:
@@ -489,34 +700,29 @@ def display_ai_insights(insights):
         "Key Insights", "Recommendations", "Risks & Opportunities", "Anomalies"
     ])
     
+    # Each list is rendered as one markdown/alert element instead of one per item
     with tab1:
         if insights.get('key_insights'):
-            for insight in insights['key_insights']:
-                st.markdown(f"""
-                <div class="insight-box">
-                    <strong>🔍</strong> {insight}
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("".join(
+                f'<div class="insight-box"><strong>🔍</strong> {insight}</div>'
+                for insight in insights['key_insights']
+            ), unsafe_allow_html=True)
         
         if insights.get('strengths'):
             st.markdown("### ✅ Strengths")
-            for strength in insights['strengths']:
-                st.success(f"✓ {strength}")
+            st.success("  \n".join(f"✓ {strength}" for strength in insights['strengths']))
         
         if insights.get('concerns'):
             st.markdown("### ⚠️ Concerns")
-            for concern in insights['concerns']:
-                st.warning(f"⚠ {concern}")
+            st.warning("  \n".join(f"⚠ {concern}" for concern in insights['concerns']))
     
     with tab2:
         if insights.get('recommendations'):
             st.markdown("### 💡 Actionable Recommendations")
-            for idx, rec in enumerate(insights['recommendations'], 1):
-                st.markdown(f"""
-                <div class="success-box">
-                    <strong>{idx}.</strong> {rec}
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("".join(
+                f'<div class="success-box"><strong>{idx}.</strong> {rec}</div>'
+                for idx, rec in enumerate(insights['recommendations'], 1)
+            ), unsafe_allow_html=True)
     
     with tab3:
         col1, col2 = st.columns(2)
@@ -524,38 +730,44 @@ def display_ai_insights(insights):
         with col1:
             if insights.get('risks'):
                 st.markdown("### ⚠️ Risk Assessment")
-                for risk in insights['risks']:
-                    st.markdown(f"""
-                    <div class="warning-box">
-                        <strong>🔸</strong> {risk}
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.markdown("".join(
+                    f'<div class="warning-box"><strong>🔸</strong> {risk}</div>'
+                    for risk in insights['risks']
+                ), unsafe_allow_html=True)
         
         with col2:
             if insights.get('opportunities'):
                 st.markdown("### 🎯 Growth Opportunities")
-                for opp in insights['opportunities']:
-                    st.markdown(f"""
-                    <div class="success-box">
-                        <strong>📈</strong> {opp}
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.markdown("".join(
+                    f'<div class="success-box"><strong>📈</strong> {opp}</div>'
+                    for opp in insights['opportunities']
+                ), unsafe_allow_html=True)
     
     with tab4:
         if insights.get('anomalies'):
             st.markdown("### 🔍 Detected Anomalies")
-            for anomaly in insights['anomalies']:
-                severity_color = {
-                    'high': '🔴',
-                    'medium': '🟡',
-                    'low': '🟢'
-                }
-                color = severity_color.get(anomaly.get('severity', 'low'), '🔵')
-                st.warning(f"{color} **{anomaly.get('type', 'Anomaly').replace('_', ' ').title()}:** {anomaly.get('message', 'Detected')}")
+            severity_color = {
+                'high': '🔴',
+                'medium': '🟡',
+                'low': '🟢'
+            }
+            st.warning("  \n".join(
+                f"{severity_color.get(anomaly.get('severity', 'low'), '🔵')} "
+                f"**{anomaly.get('type', 'Anomaly').replace('_', ' ').title()}:** {anomaly.get('message', 'Detected')}"
+                for anomaly in insights['anomalies']
+            ))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def summary_statistics(df):
+    """df.describe().T, cached so widget reruns skip the full numeric scan."""
+    return df.describe().T
 
 
 def display_comprehensive_dashboard(df, financial_data):
     """Display comprehensive visual dashboard."""
+    go = plotly_go()
+    
     st.subheader("📊 Interactive Dashboard")
     
     # Revenue and Cost Trends
@@ -594,17 +806,44 @@ def display_comprehensive_dashboard(df, financial_data):
     
     with col1:
         st.markdown("### 📈 Key Statistics")
-        stats_df = df.describe().T
+        stats_df = summary_statistics(df)
         st.dataframe(stats_df, use_container_width=True)
     
     with col2:
         st.markdown("### 📊 Data Distribution")
         # Show distribution of numeric columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols = df.attrs.get('numeric_cols') or df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) > 0:
-            selected_col = st.selectbox("Select column to visualize", numeric_cols)
-            fig = px.histogram(df, x=selected_col, nbins=30, title=f'Distribution of {selected_col}')
-            st.plotly_chart(fig, use_container_width=True)
+            distribution_chart(df, numeric_cols)
+
+
+@st.fragment
+def distribution_chart(df, numeric_cols):
+    """
+    Column picker and histogram. Runs as a fragment, so changing the column
+    reruns only this block instead of the whole analysis script.
+    """
+    go = plotly_go()
+    
+    selected_col = st.selectbox("Select column to visualize", numeric_cols)
+    # Bin server-side so only 30 bars go to the browser, not the whole column
+    values = df[selected_col].dropna().to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(values, bins=30)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=f'Distribution of {selected_col}', xaxis_title=selected_col,
+                      yaxis_title='count', bargap=0, height=450)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+RAW_PREVIEW_ROWS = 500
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def raw_data_csv(df):
+    """Raw data as CSV bytes - a much faster export than a full Excel workbook."""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
 
 
 def main():
@@ -702,8 +941,8 @@ def main():
             df, analysis_result, error_msg = load_and_process_file(uploaded_file=uploaded_file)
     
     elif use_sample:
-        sample_path = Path('data/Hackathon/Inputs/ABC_Book_Stores_Inventory_Register.xlsx')
-        if sample_path.exists():
+        sample_path = sample_dataset_path()
+        if sample_path is not None:
             with st.spinner("🔄 Loading sample dataset..."):
                 df, analysis_result, error_msg = load_and_process_file(file_path=str(sample_path))
         else:
@@ -773,8 +1012,7 @@ def main():
     
     # Calculate all metrics
     financial_data = analysis_result['financial_data']
-    calculator = AdvancedFinancialCalculator()
-    metrics_results = calculator.calculate_all_metrics(financial_data)
+    metrics_results = calculate_metrics(financial_data)
     
     # Display financial metrics
     display_financial_metrics(metrics_results)
@@ -782,17 +1020,27 @@ def main():
     st.markdown("---")
     
     # Generate and display AI insights
-    if use_llm and api_key:
+    from llm_integration import (generate_ai_insights, stream_ai_insights, batch_stream,
+                                 insights_from_text, has_analysable_data)
+    
+    # Nothing computed (e.g. a malformed upload) - skip the API call for rule-based insights
+    if use_llm and api_key and has_analysable_data(financial_data, metrics_results):
         with st.spinner("🤖 Generating AI insights..."):
             try:
-                ai_insights = generate_ai_insights(
-                    {'business_type': analysis_result['analysis']['business_type'], 
-                     'data_quality': analysis_result['analysis']['data_quality'],
-                     'df': df},
-                    financial_data,
-                    metrics_results,
-                    api_key=api_key
-                )
+                dataset_info = {'business_type': analysis_result['analysis']['business_type'],
+                                'data_quality': analysis_result['analysis']['data_quality'],
+                                'df': df}
+                
+                # Render the analysis as it streams in (batched to ~20 updates/s),
+                # then swap in the structured view
+                placeholder = st.empty()
+                with placeholder.container():
+                    analysis_text = st.write_stream(batch_stream(
+                        stream_ai_insights(dataset_info, financial_data, metrics_results, api_key=api_key)
+                    ))
+                placeholder.empty()
+                
+                ai_insights = insights_from_text(analysis_text, dataset_info, financial_data, api_key=api_key)
                 display_ai_insights(ai_insights)
             except Exception as e:
                 st.warning(f"⚠️ AI insights unavailable: {str(e)}")
@@ -832,40 +1080,52 @@ def main():
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"financial_analysis_{timestamp}.xlsx"
                 
-                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                # Build the workbook in memory and hand the bytes straight to the download button
+                buffer = io.BytesIO()
+                with pd.ExcelWriter(buffer, engine=EXCEL_EXPORT_ENGINE) as writer:
                     # Raw data
                     df.to_excel(writer, sheet_name='Raw_Data', index=False)
                     
-                    # Metrics summary
-                    metrics_df = pd.DataFrame([
-                        {k: str(v) for k, v in metric.items()} 
-                        for metric in metrics_results.values()
-                    ])
+                    # Metrics summary - numbers go through as numbers; only the
+                    # object columns (e.g. lists of present values) are stringified
+                    metrics_df = pd.DataFrame(map(round_result, metrics_results.values()))
+                    obj_cols = metrics_df.columns[metrics_df.dtypes == object]
+                    metrics_df[obj_cols] = metrics_df[obj_cols].astype(str).where(metrics_df[obj_cols].notna())
                     metrics_df.to_excel(writer, sheet_name='Metrics', index=False)
                     
                     # Insights
                     if 'key_insights' in ai_insights:
-                        insights_df = pd.DataFrame({
-                            'Insights': ai_insights.get('key_insights', []),
-                            'Recommendations': ai_insights.get('recommendations', [])[:len(ai_insights.get('key_insights', []))]
-                        })
+                        insights_df = pd.DataFrame(
+                            zip_longest(ai_insights['key_insights'], ai_insights.get('recommendations', []), fillvalue=''),
+                            columns=['Insights', 'Recommendations']
+                        )
                         insights_df.to_excel(writer, sheet_name='AI_Insights', index=False)
                 
                 st.success(f"✅ Report exported: {filename}")
                 
-                with open(filename, 'rb') as f:
-                    st.download_button(
-                        label="📥 Download Report",
-                        data=f,
-                        file_name=filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                st.download_button(
+                    label="📥 Download Report",
+                    data=buffer.getvalue(),
+                    file_name=filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
             except Exception as e:
                 st.error(f"❌ Export failed: {str(e)}")
     
     with col2:
         with st.expander("📄 View Raw Data"):
-            st.dataframe(df, use_container_width=True, height=400)
+            # Only ship the first rows to the browser; the full data is in the exports
+            st.dataframe(df.head(RAW_PREVIEW_ROWS), use_container_width=True, height=400)
+            if len(df) > RAW_PREVIEW_ROWS:
+                st.caption(f"Showing {RAW_PREVIEW_ROWS:,} of {len(df):,} rows")
+        
+        st.download_button(
+            label="📥 Download Raw Data (CSV)",
+            data=raw_data_csv(df),
+            file_name=f"raw_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
 
 
 if __name__ == "__main__":
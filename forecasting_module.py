@@ -5,11 +5,83 @@ Supports ARIMA and trend-based forecasting
 
 import pandas as pd
 import numpy as np
+from numpy.polynomial import polynomial as P
 from typing import Dict, List, Tuple
 import warnings
+from functools import lru_cache
 warnings.filterwarnings('ignore')
 
 
+@lru_cache(maxsize=64)
+def _trend_basis(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Basis Z = [1, x] for x = 0..n-1 and its pseudo-inverse P = (ZᵀZ)⁻¹Zᵀ.
+    Both depend only on n, so they are built once per series length.
+    """
+    basis = P.polyvander(np.arange(n, dtype=np.float64), 1)
+    projection = np.linalg.pinv(basis)
+    basis.setflags(write=False)
+    projection.setflags(write=False)
+    return basis, projection
+
+
+@lru_cache(maxsize=32)
+def _period_index(periods: int) -> np.ndarray:
+    """Read-only [1, 2, ..., periods] as float64 for compounding."""
+    k = np.arange(1, periods + 1, dtype=np.float64)
+    k.setflags(write=False)
+    return k
+
+
+def _linear_trend(y: np.ndarray) -> Tuple[float, float, np.ndarray]:
+    """
+    Least-squares line through (0..n-1, y) as one product with the cached
+    projection matrix. Returns (trend, intercept, residuals).
+    """
+    basis, projection = _trend_basis(y.size)
+    intercept, trend = projection @ y
+    residuals = y - basis @ (intercept, trend)
+    return trend, intercept, residuals
+
+
+def _fit_line_and_forecast(y: np.ndarray, periods: int) -> Tuple[np.ndarray, float, float, float]:
+    """
+    Fit the trend line and extend it `periods` steps past the data.
+    Returns (forecasts, trend, intercept, residual std).
+    """
+    trend, intercept, residuals = _linear_trend(y)
+    forecasts = trend * np.arange(y.size, y.size + periods) + intercept
+    return forecasts, trend, intercept, residuals.std()
+
+
+def _revenue_forecast_result(forecasts: np.ndarray, trend: float, avg_revenue: float,
+                             std_error: float, periods: int) -> Dict:
+    """Result dict shared by forecast_revenue and forecast_revenue_batch."""
+    # Calculate growth rate
+    growth_rate = (trend / avg_revenue) * 100 if avg_revenue != 0 else 0
+    
+    # Confidence intervals (simple approach)
+    lower_bound = forecasts - (1.96 * std_error)
+    upper_bound = forecasts + (1.96 * std_error)
+    
+    # Insights
+    trend_direction = "increasing" if trend > 0 else "decreasing" if trend < 0 else "stable"
+    
+    return {
+        'forecasts': forecasts.tolist(),
+        'lower_bound': lower_bound.tolist(),
+        'upper_bound': upper_bound.tolist(),
+        'trend': trend,
+        'growth_rate': growth_rate,
+        'trend_direction': trend_direction,
+        'current_avg': avg_revenue,
+        'forecast_avg': np.mean(forecasts),
+        'periods': periods,
+        'insight': f"Revenue is {trend_direction} at {abs(growth_rate):.1f}% per period. "
+                  f"Expected average: ₹{np.mean(forecasts):,.0f}"
+    }
+
+
 class FinancialForecaster:
     """
     Forecast revenue, sales, and profit trends.
@@ -36,44 +108,47 @@ class FinancialForecaster:
             if len(revenue) < 3:
                 return {'error': 'Need at least 3 data points for forecasting'}
             
-            # Calculate trend
-            x = np.arange(len(revenue))
-            y = revenue.values
-            
-            # Simple linear regression for trend
-            z = np.polyfit(x, y, 1)
-            trend = z[0]  # Slope
-            intercept = z[1]
+            # Simple linear regression for trend, extended over the forecast periods
+            forecasts, trend, _, std_error = _fit_line_and_forecast(revenue.to_numpy(dtype=np.float64), periods)
             
-            # Generate forecasts
-            last_index = len(revenue)
-            forecast_indices = np.arange(last_index, last_index + periods)
-            forecasts = trend * forecast_indices + intercept
+            return _revenue_forecast_result(forecasts, trend, revenue.mean(), std_error, periods)
             
-            # Calculate growth rate
-            avg_revenue = revenue.mean()
-            growth_rate = (trend / avg_revenue) * 100 if avg_revenue != 0 else 0
-            
-            # Confidence intervals (simple approach)
-            std_error = np.std(y - (trend * x + intercept))
-            lower_bound = forecasts - (1.96 * std_error)
-            upper_bound = forecasts + (1.96 * std_error)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    @staticmethod
+    def forecast_revenue_batch(df: pd.DataFrame, revenue_cols: List[str], periods: int = 6) -> Dict:
+        """
+        Forecast several revenue columns in one pass.
+        Columns without gaps are fitted together with one projection product;
+        columns with missing values fall back to forecast_revenue.
+        
+        Returns:
+            Dictionary of forecast_revenue results keyed by column
+        """
+        try:
+            values = df[revenue_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            n = values.shape[0]
+            complete = ~np.isnan(values).any(axis=0)
+            results = {}
             
-            # Insights
-            trend_direction = "increasing" if trend > 0 else "decreasing" if trend < 0 else "stable"
+            if n >= 3 and complete.any():
+                Y = values[:, complete]
+                basis, projection = _trend_basis(n)
+                betas = projection @ Y  # row 0: intercepts, row 1: trends
+                std_errors = (Y - basis @ betas).std(axis=0)
+                forecasts = np.outer(np.arange(n, n + periods), betas[1]) + betas[0]
+                averages = Y.mean(axis=0)
+                
+                batch_cols = [col for col, ok in zip(revenue_cols, complete) if ok]
+                for j, col in enumerate(batch_cols):
+                    results[col] = _revenue_forecast_result(
+                        forecasts[:, j], betas[1, j], averages[j], std_errors[j], periods
+                    )
             
             return {
-                'forecasts': forecasts.tolist(),
-                'lower_bound': lower_bound.tolist(),
-                'upper_bound': upper_bound.tolist(),
-                'trend': trend,
-                'growth_rate': growth_rate,
-                'trend_direction': trend_direction,
-                'current_avg': avg_revenue,
-                'forecast_avg': np.mean(forecasts),
-                'periods': periods,
-                'insight': f"Revenue is {trend_direction} at {abs(growth_rate):.1f}% per period. "
-                          f"Expected average: ₹{np.mean(forecasts):,.0f}"
+                col: results[col] if col in results else FinancialForecaster.forecast_revenue(df, col, periods)
+                for col in revenue_cols
             }
             
         except Exception as e:
@@ -83,25 +158,17 @@ class FinancialForecaster:
     def forecast_profit(df: pd.DataFrame, revenue_col: str, cost_col: str, periods: int = 6) -> Dict:
         """Forecast future profit trends."""
         try:
-            revenue = pd.to_numeric(df[revenue_col], errors='coerce').dropna()
-            cost = pd.to_numeric(df[cost_col], errors='coerce').dropna()
+            # Coerce both columns together and keep only rows where both are present,
+            # so revenue and cost stay paired period by period
+            paired = df[[revenue_col, cost_col]].apply(pd.to_numeric, errors='coerce').dropna()
             
-            if len(revenue) < 3 or len(cost) < 3:
+            if len(paired) < 3:
                 return {'error': 'Need at least 3 data points'}
             
-            profit = revenue - cost
+            profit = paired[revenue_col].to_numpy(dtype=np.float64) - paired[cost_col].to_numpy(dtype=np.float64)
             
-            # Trend analysis
-            x = np.arange(len(profit))
-            y = profit.values
-            z = np.polyfit(x, y, 1)
-            trend = z[0]
-            intercept = z[1]
-            
-            # Forecasts
-            last_index = len(profit)
-            forecast_indices = np.arange(last_index, last_index + periods)
-            forecasts = trend * forecast_indices + intercept
+            # Trend analysis and forecasts
+            forecasts, trend, _, _ = _fit_line_and_forecast(profit, periods)
             
             # Growth rate
             avg_profit = profit.mean()
@@ -124,6 +191,59 @@ class FinancialForecaster:
         except Exception as e:
             return {'error': str(e)}
     
+    @staticmethod
+    def prepare_prefix(y) -> Dict:
+        """
+        Prefix sums of x, x², y, xy and y² (x = 0..n-1) for a series, so that
+        fit_subinterval can fit any window in constant time.
+        y is stored relative to its mean to limit cancellation in the sums.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        offset = y.mean() if y.size else 0.0
+        yc = y - offset
+        x = np.arange(y.size, dtype=np.float64)
+        
+        def prefix(values):
+            return np.concatenate(([0.0], np.cumsum(values)))
+        
+        return {
+            'n': y.size,
+            'offset': offset,
+            'S1': prefix(yc),
+            'Sx': prefix(x),
+            'Sxx': prefix(x * x),
+            'Sxy': prefix(x * yc),
+            'Syy': prefix(yc * yc)
+        }
+    
+    @staticmethod
+    def fit_subinterval(prefix: Dict, start: int, stop: int) -> Dict:
+        """
+        Trend line over y[start:stop] from prepare_prefix output in O(1).
+        trend/intercept/std_error match forecast_revenue on the same window
+        (intercept is at the window's first point).
+        """
+        m = stop - start
+        if start < 0 or stop > prefix['n'] or m < 3:
+            return {'error': 'Need a window of at least 3 data points inside the series'}
+        
+        sy = prefix['S1'][stop] - prefix['S1'][start]
+        sx = prefix['Sx'][stop] - prefix['Sx'][start]
+        sxx = prefix['Sxx'][stop] - prefix['Sxx'][start]
+        sxy = prefix['Sxy'][stop] - prefix['Sxy'][start]
+        syy = prefix['Syy'][stop] - prefix['Syy'][start]
+        
+        trend = (m * sxy - sx * sy) / (m * sxx - sx * sx)
+        intercept = (sy - trend * sx) / m  # at x = 0, centered y
+        sse = syy - intercept * sy - trend * sxy
+        
+        return {
+            'trend': trend,
+            'intercept': intercept + trend * start + prefix['offset'],
+            'std_error': np.sqrt(max(sse, 0.0) / m),
+            'points': m
+        }
+    
     @staticmethod
     def calculate_breakeven_forecast(fixed_costs: float, variable_cost_per_unit: float, 
                                      price_per_unit: float) -> Dict:
@@ -154,17 +274,50 @@ class FinancialForecaster:
         except Exception as e:
             return {'error': str(e)}
     
+    @staticmethod
+    def calculate_breakeven_forecast_batch(fixed_costs, variable_cost_per_unit,
+                                           price_per_unit) -> Dict:
+        """
+        Break-even for a grid of scenarios at once (inputs broadcast as arrays).
+        Scenarios where price <= variable cost come back as NaN.
+        """
+        try:
+            fixed = np.asarray(fixed_costs, dtype=np.float64)
+            vcu = np.asarray(variable_cost_per_unit, dtype=np.float64)
+            ppu = np.asarray(price_per_unit, dtype=np.float64)
+            
+            contribution_margin = ppu - vcu
+            valid = contribution_margin > 0
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                breakeven_units = np.where(valid, fixed / np.where(valid, contribution_margin, 1.0), np.nan)
+                contribution_margin_ratio = np.where(valid, contribution_margin / ppu * 100, np.nan)
+            
+            return {
+                'breakeven_units': breakeven_units,
+                'breakeven_revenue': breakeven_units * ppu,
+                'contribution_margin': contribution_margin,
+                'contribution_margin_ratio': contribution_margin_ratio
+            }
+        
+        except Exception as e:
+            return {'error': str(e)}
+    
     @staticmethod
     def analyze_seasonality(df: pd.DataFrame, value_col: str, date_col: str = None) -> Dict:
         """Analyze seasonal patterns in data."""
         try:
-            values = pd.to_numeric(df[value_col], errors='coerce').dropna()
+            # Too few rows can never yield 12 valid periods - skip the coercion
+            if len(df) < 12:
+                return {'seasonal': False, 'note': 'Need at least 12 periods for seasonality analysis'}
+            
+            values = pd.to_numeric(df[value_col], errors='coerce').dropna().to_numpy(dtype=np.float64)
             
-            if len(values) < 12:
+            if values.size < 12:
                 return {'seasonal': False, 'note': 'Need at least 12 periods for seasonality analysis'}
             
             # Simple seasonality check - compare first half vs second half
-            mid = len(values) // 2
+            mid = values.size // 2
             first_half_avg = values[:mid].mean()
             second_half_avg = values[mid:].mean()
             
@@ -191,10 +344,15 @@ class FinancialForecaster:
         Generate growth projections based on growth rate.
         """
         try:
-            projections = []
-            for i in range(1, periods + 1):
-                projected_value = current_value * ((1 + growth_rate/100) ** i)
-                projections.append(projected_value)
+            # current_value * (1 + g)**i for every period at once; in the log domain
+            # (expm1/log1p) small rates don't lose precision when compounded
+            rate = growth_rate / 100
+            i = _period_index(periods)
+            if rate > -1:
+                projections = current_value + current_value * np.expm1(i * np.log1p(rate))
+            else:
+                projections = current_value * np.power(1 + rate, i)
+            projections = projections.tolist()
             
             final_value = projections[-1]
             total_growth = ((final_value - current_value) / current_value) * 100
@@ -3,43 +3,162 @@ Industry-Specific KPIs Module
 Calculates KPIs for Retail, Service, Manufacturing, and Finance industries
 """
 
+import inspect
 import pandas as pd
 import numpy as np
+from bisect import bisect_left, bisect_right
+from functools import lru_cache, wraps
 from typing import Dict, Optional
 
 
+# Status ladders: thresholds ascending, one more label than thresholds.
+# "value > t" ladders look up with bisect_left, "value < t" with bisect_right,
+# so a value equal to a threshold lands in the same band as before.
+_TURNOVER_BINS = (2, 4, 8)
+_TURNOVER_STATUS = (
+    "Slow - Overstocking risk",
+    "Average - Monitor closely",
+    "Good - Healthy turnover",
+    "Excellent - Fast moving inventory",
+)
+
+_SALES_SQFT_BINS = (1500, 3000, 5000)
+_SALES_SQFT_STATUS = (
+    "Low - Optimize space usage",
+    "Average - Room for improvement",
+    "Good - Above average",
+    "Excellent - High productivity",
+)
+
+_CAC_BINS = (500, 2000, 5000)
+_CAC_STATUS = (
+    "Excellent - Low acquisition cost",
+    "Good - Reasonable CAC",
+    "Moderate - Monitor efficiency",
+    "High - Optimize marketing spend",
+)
+
+_UTILIZATION_BINS = (50, 70, 85)
+_UTILIZATION_STATUS = (
+    "Low - Underutilized capacity",
+    "Average - Room for improvement",
+    "Good - Healthy utilization",
+    "Excellent - High utilization",
+)
+
+_EFFICIENCY_BINS = (60, 75, 90)
+_EFFICIENCY_STATUS = (
+    "Low - Significant underutilization",
+    "Average - Improvement needed",
+    "Good - Efficient production",
+    "Excellent - Near maximum capacity",
+)
+
+_DEFECT_BINS = (1, 3, 5)
+_DEFECT_STATUS = (
+    "Excellent - High quality",
+    "Good - Acceptable quality",
+    "Average - Quality improvement needed",
+    "High - Critical quality issues",
+)
+
+_SHARPE_BINS = (0, 1, 2)
+_SHARPE_STATUS = (
+    "Poor - Not compensating for risk",
+    "Moderate - Below optimal",
+    "Good - Adequate risk-adjusted return",
+    "Excellent - High risk-adjusted return",
+)
+
+_DIVERSIFICATION_BINS = (40, 60, 80)
+_DIVERSIFICATION_STATUS = (
+    "Low - Concentration risk",
+    "Moderate - More diversification needed",
+    "Good - Adequate diversification",
+    "Excellent - Well diversified",
+)
+
+
+def _fmt(value: float, decimals: int = 2) -> str:
+    """Format a KPI value for display (results themselves stay unrounded)."""
+    return f"{value:,.{decimals}f}"
+
+
+# Denominators smaller than this are treated as zero
+_EPS = 1e-12
+
+
+def _guard_nonzero(**labels):
+    """
+    Reject zero (|x| < _EPS) or NaN denominators before a KPI runs.
+    Keyword arguments map parameter names to labels for the error message,
+    e.g. @_guard_nonzero(total_hours='Total hours').
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            for name, label in labels.items():
+                value = arguments[name]
+                try:
+                    if value != value:
+                        return {'error': f'{label} must be a number'}
+                    if abs(value) < _EPS:
+                        return {'error': f'{label} cannot be zero'}
+                except TypeError:  # non-numeric input; the KPI reports its own error
+                    pass
+            return func(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
+
+
+def _memoized(func):
+    """
+    lru_cache a KPI function (all inputs are scalars). Each call gets its own
+    copy of the cached result dict, so callers can still modify it.
+    """
+    cached = lru_cache(maxsize=256)(func)
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return dict(cached(*args, **kwargs))
+        except TypeError:  # unhashable argument
+            return func(*args, **kwargs)
+    
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
 class IndustryKPIs:
     """Calculate industry-specific Key Performance Indicators."""
     
     # RETAIL INDUSTRY KPIs
     @staticmethod
+    @_memoized
+    @_guard_nonzero(avg_inventory='Average inventory')
     def calculate_inventory_turnover(cogs: float, avg_inventory: float) -> Dict:
         """
         Inventory Turnover Ratio for Retail.
         Formula: COGS / Average Inventory
         """
         try:
-            if avg_inventory == 0:
-                return {'error': 'Average inventory cannot be zero'}
-            
             turnover = cogs / avg_inventory
             days_inventory = 365 / turnover if turnover > 0 else 0
             
             # Interpretation
-            if turnover > 8:
-                status = "Excellent - Fast moving inventory"
-            elif turnover > 4:
-                status = "Good - Healthy turnover"
-            elif turnover > 2:
-                status = "Average - Monitor closely"
-            else:
-                status = "Slow - Overstocking risk"
+            status = _TURNOVER_STATUS[bisect_left(_TURNOVER_BINS, turnover)]
             
             return {
-                'inventory_turnover': round(turnover, 2),
-                'days_inventory_outstanding': round(days_inventory, 0),
-                'cogs': round(cogs, 2),
-                'avg_inventory': round(avg_inventory, 2),
+                'inventory_turnover': turnover,
+                'days_inventory_outstanding': days_inventory,
+                'cogs': cogs,
+                'avg_inventory': avg_inventory,
                 'status': status,
                 'insight': f"Inventory turns {turnover:.1f} times per year ({days_inventory:.0f} days). {status}",
                 'benchmark': 'Retail average: 4-8 times/year'
@@ -48,55 +167,46 @@ class IndustryKPIs:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
+    @_guard_nonzero(store_sqft='Store square footage')
     def calculate_sales_per_sqft(revenue: float, store_sqft: float) -> Dict:
         """
         Sales per Square Foot for Retail.
         Formula: Revenue / Store Square Footage
         """
         try:
-            if store_sqft == 0:
-                return {'error': 'Store square footage cannot be zero'}
-            
             sales_per_sqft = revenue / store_sqft
             
             # Interpretation (in Rupees)
-            if sales_per_sqft > 5000:
-                status = "Excellent - High productivity"
-            elif sales_per_sqft > 3000:
-                status = "Good - Above average"
-            elif sales_per_sqft > 1500:
-                status = "Average - Room for improvement"
-            else:
-                status = "Low - Optimize space usage"
+            status = _SALES_SQFT_STATUS[bisect_left(_SALES_SQFT_BINS, sales_per_sqft)]
             
             return {
-                'sales_per_sqft': round(sales_per_sqft, 2),
-                'revenue': round(revenue, 2),
-                'store_sqft': round(store_sqft, 2),
+                'sales_per_sqft': sales_per_sqft,
+                'revenue': revenue,
+                'store_sqft': store_sqft,
                 'status': status,
-                'insight': f"₹{sales_per_sqft:,.0f} per sq ft. {status}",
+                'insight': f"₹{_fmt(sales_per_sqft, 0)} per sq ft. {status}",
                 'benchmark': 'Retail average: ₹2,000-₹4,000/sq ft'
             }
         except Exception as e:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
+    @_guard_nonzero(num_transactions='Number of transactions')
     def calculate_basket_value(revenue: float, num_transactions: int) -> Dict:
         """
         Average Basket Value for Retail.
         Formula: Revenue / Number of Transactions
         """
         try:
-            if num_transactions == 0:
-                return {'error': 'Number of transactions cannot be zero'}
-            
             avg_basket = revenue / num_transactions
             
             return {
-                'average_basket_value': round(avg_basket, 2),
-                'revenue': round(revenue, 2),
+                'average_basket_value': avg_basket,
+                'revenue': revenue,
                 'num_transactions': num_transactions,
-                'insight': f"Average transaction value: ₹{avg_basket:,.2f}",
+                'insight': f"Average transaction value: ₹{_fmt(avg_basket)}",
                 'recommendation': 'Increase basket size through upselling and cross-selling'
             }
         except Exception as e:
@@ -104,39 +214,32 @@ class IndustryKPIs:
     
     # SERVICE INDUSTRY KPIs
     @staticmethod
+    @_memoized
+    @_guard_nonzero(new_customers='Number of new customers')
     def calculate_cac(marketing_cost: float, new_customers: int) -> Dict:
         """
         Customer Acquisition Cost (CAC) for Services.
         Formula: Marketing Cost / New Customers
         """
         try:
-            if new_customers == 0:
-                return {'error': 'Number of new customers cannot be zero'}
-            
             cac = marketing_cost / new_customers
             
             # Interpretation
-            if cac < 500:
-                status = "Excellent - Low acquisition cost"
-            elif cac < 2000:
-                status = "Good - Reasonable CAC"
-            elif cac < 5000:
-                status = "Moderate - Monitor efficiency"
-            else:
-                status = "High - Optimize marketing spend"
+            status = _CAC_STATUS[bisect_right(_CAC_BINS, cac)]
             
             return {
-                'cac': round(cac, 2),
-                'marketing_cost': round(marketing_cost, 2),
+                'cac': cac,
+                'marketing_cost': marketing_cost,
                 'new_customers': new_customers,
                 'status': status,
-                'insight': f"Cost to acquire one customer: ₹{cac:,.2f}. {status}",
+                'insight': f"Cost to acquire one customer: ₹{_fmt(cac)}. {status}",
                 'benchmark': 'Service industry average: ₹1,000-₹3,000'
             }
         except Exception as e:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
     def calculate_clv(avg_revenue_per_customer: float, avg_customer_lifespan_years: float,
                      profit_margin: float) -> Dict:
         """
@@ -147,42 +250,34 @@ class IndustryKPIs:
             clv = avg_revenue_per_customer * avg_customer_lifespan_years * profit_margin
             
             return {
-                'clv': round(clv, 2),
-                'avg_revenue_per_customer': round(avg_revenue_per_customer, 2),
+                'clv': clv,
+                'avg_revenue_per_customer': avg_revenue_per_customer,
                 'avg_lifespan_years': avg_customer_lifespan_years,
                 'profit_margin': profit_margin,
-                'insight': f"Average customer lifetime value: ₹{clv:,.2f}",
+                'insight': f"Average customer lifetime value: ₹{_fmt(clv)}",
                 'recommendation': 'Focus on retention to maximize CLV'
             }
         except Exception as e:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
+    @_guard_nonzero(total_hours='Total hours')
     def calculate_utilization_rate(billable_hours: float, total_hours: float) -> Dict:
         """
         Utilization Rate for Services.
         Formula: Billable Hours / Total Available Hours × 100
         """
         try:
-            if total_hours == 0:
-                return {'error': 'Total hours cannot be zero'}
-            
             utilization = (billable_hours / total_hours) * 100
             
             # Interpretation
-            if utilization > 85:
-                status = "Excellent - High utilization"
-            elif utilization > 70:
-                status = "Good - Healthy utilization"
-            elif utilization > 50:
-                status = "Average - Room for improvement"
-            else:
-                status = "Low - Underutilized capacity"
+            status = _UTILIZATION_STATUS[bisect_left(_UTILIZATION_BINS, utilization)]
             
             return {
-                'utilization_rate': round(utilization, 2),
-                'billable_hours': round(billable_hours, 2),
-                'total_hours': round(total_hours, 2),
+                'utilization_rate': utilization,
+                'billable_hours': billable_hours,
+                'total_hours': total_hours,
                 'status': status,
                 'insight': f"{utilization:.1f}% of time is billable. {status}",
                 'benchmark': 'Service industry target: 75-85%'
@@ -192,32 +287,24 @@ class IndustryKPIs:
     
     # MANUFACTURING INDUSTRY KPIs
     @staticmethod
+    @_memoized
+    @_guard_nonzero(theoretical_capacity='Theoretical capacity')
     def calculate_production_efficiency(actual_output: float, theoretical_capacity: float) -> Dict:
         """
         Production Efficiency for Manufacturing.
         Formula: Actual Output / Theoretical Capacity × 100
         """
         try:
-            if theoretical_capacity == 0:
-                return {'error': 'Theoretical capacity cannot be zero'}
-            
             efficiency = (actual_output / theoretical_capacity) * 100
             
             # Interpretation
-            if efficiency > 90:
-                status = "Excellent - Near maximum capacity"
-            elif efficiency > 75:
-                status = "Good - Efficient production"
-            elif efficiency > 60:
-                status = "Average - Improvement needed"
-            else:
-                status = "Low - Significant underutilization"
+            status = _EFFICIENCY_STATUS[bisect_left(_EFFICIENCY_BINS, efficiency)]
             
             return {
-                'production_efficiency': round(efficiency, 2),
-                'actual_output': round(actual_output, 2),
-                'theoretical_capacity': round(theoretical_capacity, 2),
-                'capacity_gap': round(theoretical_capacity - actual_output, 2),
+                'production_efficiency': efficiency,
+                'actual_output': actual_output,
+                'theoretical_capacity': theoretical_capacity,
+                'capacity_gap': theoretical_capacity - actual_output,
                 'status': status,
                 'insight': f"Operating at {efficiency:.1f}% of capacity. {status}",
                 'benchmark': 'Manufacturing target: 80-95%'
@@ -226,53 +313,44 @@ class IndustryKPIs:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
+    @_guard_nonzero(units_produced='Units produced')
     def calculate_cost_per_unit(total_cost: float, units_produced: float) -> Dict:
         """
         Cost per Unit for Manufacturing.
         Formula: Total Cost / Units Produced
         """
         try:
-            if units_produced == 0:
-                return {'error': 'Units produced cannot be zero'}
-            
             cost_per_unit = total_cost / units_produced
             
             return {
-                'cost_per_unit': round(cost_per_unit, 2),
-                'total_cost': round(total_cost, 2),
-                'units_produced': round(units_produced, 2),
-                'insight': f"Cost to produce one unit: ₹{cost_per_unit:,.2f}",
+                'cost_per_unit': cost_per_unit,
+                'total_cost': total_cost,
+                'units_produced': units_produced,
+                'insight': f"Cost to produce one unit: ₹{_fmt(cost_per_unit)}",
                 'recommendation': 'Monitor for economies of scale opportunities'
             }
         except Exception as e:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
+    @_guard_nonzero(total_units='Total units')
     def calculate_defect_rate(defective_units: float, total_units: float) -> Dict:
         """
         Defect Rate for Manufacturing.
         Formula: Defective Units / Total Units × 100
         """
         try:
-            if total_units == 0:
-                return {'error': 'Total units cannot be zero'}
-            
             defect_rate = (defective_units / total_units) * 100
             
             # Interpretation
-            if defect_rate < 1:
-                status = "Excellent - High quality"
-            elif defect_rate < 3:
-                status = "Good - Acceptable quality"
-            elif defect_rate < 5:
-                status = "Average - Quality improvement needed"
-            else:
-                status = "High - Critical quality issues"
+            status = _DEFECT_STATUS[bisect_right(_DEFECT_BINS, defect_rate)]
             
             return {
-                'defect_rate': round(defect_rate, 2),
-                'defective_units': round(defective_units, 2),
-                'total_units': round(total_units, 2),
+                'defect_rate': defect_rate,
+                'defective_units': defective_units,
+                'total_units': total_units,
                 'status': status,
                 'insight': f"{defect_rate:.2f}% defect rate. {status}",
                 'benchmark': 'Manufacturing target: <2%'
@@ -282,6 +360,8 @@ class IndustryKPIs:
     
     # FINANCE/INVESTMENT KPIs
     @staticmethod
+    @_memoized
+    @_guard_nonzero(std_deviation='Standard deviation')
     def calculate_sharpe_ratio(portfolio_return: float, risk_free_rate: float, 
                               std_deviation: float) -> Dict:
         """
@@ -289,27 +369,17 @@ class IndustryKPIs:
         Formula: (Portfolio Return - Risk Free Rate) / Standard Deviation
         """
         try:
-            if std_deviation == 0:
-                return {'error': 'Standard deviation cannot be zero'}
-            
             sharpe = (portfolio_return - risk_free_rate) / std_deviation
             
             # Interpretation
-            if sharpe > 2:
-                status = "Excellent - High risk-adjusted return"
-            elif sharpe > 1:
-                status = "Good - Adequate risk-adjusted return"
-            elif sharpe > 0:
-                status = "Moderate - Below optimal"
-            else:
-                status = "Poor - Not compensating for risk"
+            status = _SHARPE_STATUS[bisect_left(_SHARPE_BINS, sharpe)]
             
             return {
-                'sharpe_ratio': round(sharpe, 4),
-                'portfolio_return': round(portfolio_return, 4),
-                'risk_free_rate': round(risk_free_rate, 4),
-                'std_deviation': round(std_deviation, 4),
-                'excess_return': round(portfolio_return - risk_free_rate, 4),
+                'sharpe_ratio': sharpe,
+                'portfolio_return': portfolio_return,
+                'risk_free_rate': risk_free_rate,
+                'std_deviation': std_deviation,
+                'excess_return': portfolio_return - risk_free_rate,
                 'status': status,
                 'insight': f"Sharpe ratio: {sharpe:.2f}. {status}",
                 'benchmark': 'Good Sharpe ratio: >1.0'
@@ -318,6 +388,7 @@ class IndustryKPIs:
             return {'error': str(e)}
     
     @staticmethod
+    @_memoized
     def calculate_portfolio_diversification(num_assets: int, correlation_avg: float) -> Dict:
         """
         Portfolio Diversification Index.
@@ -332,22 +403,52 @@ class IndustryKPIs:
             diversification_index = asset_score + correlation_score
             
             # Interpretation
-            if diversification_index > 80:
-                status = "Excellent - Well diversified"
-            elif diversification_index > 60:
-                status = "Good - Adequate diversification"
-            elif diversification_index > 40:
-                status = "Moderate - More diversification needed"
-            else:
-                status = "Low - Concentration risk"
+            status = _DIVERSIFICATION_STATUS[bisect_left(_DIVERSIFICATION_BINS, diversification_index)]
             
             return {
-                'diversification_index': round(diversification_index, 2),
+                'diversification_index': diversification_index,
                 'num_assets': num_assets,
-                'avg_correlation': round(correlation_avg, 4),
+                'avg_correlation': correlation_avg,
                 'status': status,
                 'insight': f"Diversification score: {diversification_index:.0f}/100. {status}",
                 'recommendation': 'Add uncorrelated assets to improve diversification'
             }
         except Exception as e:
             return {'error': str(e)}
+    
+    # KPIs run for each industry by compute_all
+    INDUSTRY_KPIS = {
+        'retail': ('calculate_inventory_turnover', 'calculate_sales_per_sqft', 'calculate_basket_value'),
+        'service': ('calculate_cac', 'calculate_clv', 'calculate_utilization_rate'),
+        'manufacturing': ('calculate_production_efficiency', 'calculate_cost_per_unit', 'calculate_defect_rate'),
+        'finance': ('calculate_sharpe_ratio', 'calculate_portfolio_diversification'),
+    }
+    
+    @staticmethod
+    def compute_all(industry: str, params: Dict) -> pd.DataFrame:
+        """
+        Run every KPI for an industry from one dict of inputs.
+        Returns one row per KPI; KPIs whose inputs are missing get an error row.
+        """
+        names = IndustryKPIs.INDUSTRY_KPIS.get(industry.lower())
+        if names is None:
+            raise ValueError(f"Unknown industry '{industry}'. "
+                             f"Choose from: {', '.join(IndustryKPIs.INDUSTRY_KPIS)}")
+        
+        records = []
+        for name in names:
+            required = _kpi_parameters(name)
+            missing = [p for p in required if p not in params]
+            if missing:
+                result = {'error': f"Missing inputs: {', '.join(missing)}"}
+            else:
+                result = getattr(IndustryKPIs, name)(*(params[p] for p in required))
+            records.append({'kpi': name[len('calculate_'):], **result})
+        
+        return pd.DataFrame.from_records(records)
+
+
+@lru_cache(maxsize=None)
+def _kpi_parameters(name: str) -> tuple:
+    """Parameter names of an IndustryKPIs calculator, read once per KPI."""
+    return tuple(inspect.signature(getattr(IndustryKPIs, name)).parameters)
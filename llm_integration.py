@@ -3,9 +3,200 @@ LLM Integration for AI-Powered Financial Analysis
 Provides intelligent insights, recommendations, and anomaly detection
 """
 
+import asyncio
+import hashlib
+import importlib.util
 import os
-from typing import Dict, List, Optional
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
+import numpy as np
+
+
+# Fixed part of every analysis request (system role + answer format). Kept
+# byte-identical across calls so it forms a cacheable prompt prefix.
+_ANALYSIS_TASK = """You are an expert financial analyst providing insights on business data.
+
+For the financial dataset in the user message, please provide:
+1. **Key Insights**: 3-5 most important findings from this data
+2. **Strengths**: What the business is doing well
+3. **Concerns**: Areas that need attention or improvement
+4. **Recommendations**: Specific actionable steps to improve financial performance
+5. **Anomalies**: Any unusual patterns or outliers detected
+6. **Risk Assessment**: Potential financial risks
+7. **Growth Opportunities**: Areas for potential expansion or improvement
+"""
+
+# Insight sections, in prompt order
+SECTION_KEYS = ('key_insights', 'strengths', 'concerns', 'recommendations',
+                'anomalies', 'risks', 'opportunities')
+
+# Free-text answer (streamed to the UI)
+ANALYSIS_INSTRUCTIONS = _ANALYSIS_TASK + """
+Format your response in clear sections.
+"""
+
+# Structured answer for response_format={"type": "json_object"}
+ANALYSIS_JSON_INSTRUCTIONS = _ANALYSIS_TASK + f"""
+Return a JSON object with the keys {', '.join(SECTION_KEYS)}, each a list of strings.
+"""
+
+
+# Prompt compaction: long decimals, redundant ".00" and extra blank space cost
+# tokens without telling the model anything
+_LONG_DECIMAL_RE = re.compile(r'(?<![\d.])(\d[\d,]*)\.(\d{3,})')
+_ZERO_CENTS_RE = re.compile(r'(\d)\.00(?!\d)')
+
+
+def _round_decimal(match: re.Match) -> str:
+    whole, frac = match.groups()
+    value = float(f"{whole.replace(',', '')}.{frac}")
+    # Amounts keep 2 decimals (and their thousands separators), small ratios 4 significant digits
+    if value >= 1:
+        return f"{value:,.2f}" if ',' in whole else f"{value:.2f}"
+    return f"{value:.4g}"
+
+
+def _compact_prompt(text: str) -> str:
+    """
+    Deterministic compaction of the per-dataset part of the prompt:
+    trims long decimals, drops '.00' and collapses whitespace and blank lines.
+    """
+    text = _LONG_DECIMAL_RE.sub(_round_decimal, text)
+    text = _ZERO_CENTS_RE.sub(r'\1', text)
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+# Section headings in a free-text LLM response, tried in this order so a line
+# naming two sections ("Growth risks:") goes to the earlier one
+_SECTION_HEADERS = tuple(
+    (key, re.compile(pattern, re.IGNORECASE))
+    for key, pattern in (
+        ('key_insights', r'key insight'),
+        ('strengths', r'strength'),
+        ('concerns', r'concern'),
+        ('recommendations', r'recommendation'),
+        ('anomalies', r'anomal'),
+        ('risks', r'risk'),
+        ('opportunities', r'opportunit|growth'),
+    )
+)
+# List item prefix: "-", "•" or "1." style markers
+_BULLET_RE = re.compile(r'[-•0-9][-•0-9. ]*')
+
+
+# Chat model used when none is given; supports JSON mode (response_format)
+DEFAULT_MODEL = "gpt-4o"
+# Models that accept response_format={"type": "json_object"}; others (e.g. gpt-4)
+# reject it, so they are asked for the plain-text sections instead
+_JSON_MODE_MODELS = ('gpt-3.5-turbo', 'gpt-3.5-turbo-1106', 'gpt-3.5-turbo-0125')
+_JSON_MODE_PREFIXES = ('gpt-4o', 'gpt-4.1', 'gpt-4-turbo', 'gpt-4-1106', 'gpt-4-0125')
+
+
+def supports_json_mode(model: str) -> bool:
+    """Whether the model accepts OpenAI's JSON mode."""
+    return model in _JSON_MODE_MODELS or model.startswith(_JSON_MODE_PREFIXES)
+
+
+# Connection pool for concurrent LLM requests (see aanalyze_many)
+HTTP_MAX_CONNECTIONS = 32
+
+
+def _make_async_http_client():
+    """
+    Pooled httpx client for AsyncOpenAI. Uses HTTP/2 when the h2 package is
+    installed, so concurrent requests share one TLS connection.
+    """
+    import httpx
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec('h2') is not None,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+
+
+@lru_cache(maxsize=4)
+def _get_sync_client(api_key: str):
+    """
+    OpenAI client for streaming, shared across calls (and Streamlit reruns)
+    so its keep-alive connections are reused.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+# LLM results are reused for a day (identical prompt + model)
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+class _ResponseCache:
+    """
+    Exact-match cache of LLM analysis results, keyed by SHA-256 of the prompt.
+    Stored on disk with diskcache when installed (shared across sessions),
+    otherwise in a small in-process LRU.
+    """
+    
+    def __init__(self, directory: str = '.cache/llm', ttl: int = RESPONSE_CACHE_TTL, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        try:
+            import diskcache
+            self._disk = diskcache.Cache(directory)
+        except ImportError:
+            self._disk = None
+            self._memory = OrderedDict()
+    
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    
+    def get(self, prompt: str) -> Optional[Dict]:
+        key = self._key(prompt)
+        if self._disk is not None:
+            return self._disk.get(key)
+        
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return dict(response)
+    
+    def set(self, prompt: str, response: Dict) -> None:
+        key = self._key(prompt)
+        if self._disk is not None:
+            self._disk.set(key, response, expire=self.ttl)
+            return
+        
+        self._memory[key] = (time.monotonic() + self.ttl, dict(response))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def _get_response_cache() -> _ResponseCache:
+    """Process-wide response cache, created on first use."""
+    return _ResponseCache()
+
+
+def has_analysable_data(financial_data: Dict, metrics_results: Dict) -> bool:
+    """
+    Whether there is anything for the LLM to analyse: at least one metric that
+    computed without error, or extracted revenue/cost totals. Without either the
+    model can only return generic filler, so callers skip the API call.
+    """
+    if any(isinstance(v, dict) and 'error' not in v for v in metrics_results.values()):
+        return True
+    return any(financial_data.get(key) for key in ('revenue', 'cost'))
 
 
 class LLMFinancialAnalyzer:
@@ -13,53 +204,145 @@ class LLMFinancialAnalyzer:
     Integrates with LLM (OpenAI, Anthropic, or local models) for intelligent analysis.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_MODEL):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
         self.use_llm = bool(self.api_key)
+        self._async_client = None
+        self._async_client_loop = None
+    
+    def _get_async_client(self):
+        """
+        AsyncOpenAI client, reused for every request made on the current event loop.
+        (Its connection pool is tied to the loop, so a new loop gets a new client.)
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(api_key=self.api_key, http_client=_make_async_http_client())
+            self._async_client_loop = loop
+        return self._async_client
     
     def analyze_dataset(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict) -> Dict:
         """
         Main analysis function that generates insights using LLM.
         """
-        if not self.use_llm:
+        return asyncio.run(self._run_and_close(self.aanalyze_dataset(dataset_info, financial_data, metrics_results)))
+    
+    async def _run_and_close(self, coro):
+        """
+        Await coro, then close the client it used. asyncio.run closes its loop on
+        return, so a client left open would leak its connection pool with it.
+        """
+        try:
+            return await coro
+        finally:
+            await self.aclose()
+    
+    async def aclose(self):
+        """Close the AsyncOpenAI client (and its httpx pool) created on the running loop."""
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+    
+    async def aanalyze_dataset(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict) -> Dict:
+        """
+        Async version of analyze_dataset - awaits the completion without blocking the loop.
+        """
+        if not self.use_llm or not has_analysable_data(financial_data, metrics_results):
             return self._generate_rule_based_insights(dataset_info, financial_data, metrics_results)
         
         try:
-            # Use OpenAI API
-            import openai
-            openai.api_key = self.api_key
+            json_mode = supports_json_mode(self.model)
+            messages = self._create_messages(dataset_info, financial_data, metrics_results, json_response=json_mode)
             
-            prompt = self._create_analysis_prompt(dataset_info, financial_data, metrics_results)
+            # An unchanged dataset on a rerun gets the stored analysis, not a new API call
+            cache = _get_response_cache()
+            cache_prompt = json.dumps([self.model, messages])
+            cached = cache.get(cache_prompt)
+            if cached is not None:
+                return cached
             
-            response = openai.ChatCompletion.create(
+            # Use OpenAI API - JSON mode (where the model supports it) returns the sections directly
+            response = await self._get_async_client().chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert financial analyst providing insights on business data."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=1500
+                max_tokens=1500,
+                **({'response_format': {"type": "json_object"}} if json_mode else {})
             )
             
             analysis_text = response.choices[0].message.content
             
-            return {
-                'insights': self._parse_llm_response(analysis_text),
+            result = {
+                'insights': (self._parse_json_response(analysis_text) if json_mode
+                             else self._parse_llm_response(analysis_text)),
                 'raw_analysis': analysis_text,
                 'model_used': self.model,
                 'source': 'llm'
             }
+            cache.set(cache_prompt, result)
+            return result
         
         except Exception as e:
             # Fallback to rule-based if LLM fails
             return self._generate_rule_based_insights(dataset_info, financial_data, metrics_results)
     
-    def _create_analysis_prompt(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict) -> str:
-        """Create a comprehensive prompt for LLM analysis."""
+    async def aanalyze_many(self, datasets: List[Tuple[Dict, Dict, Dict]],
+                            max_concurrency: int = 8) -> List[Dict]:
+        """
+        Analyze several (dataset_info, financial_data, metrics_results) tuples concurrently.
+        At most max_concurrency requests are in flight at once to respect rate limits.
+        The client stays open for further calls on the same loop; await aclose() when done.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(dataset):
+            async with semaphore:
+                return await self.aanalyze_dataset(*dataset)
+        
+        return await asyncio.gather(*(run(dataset) for dataset in datasets))
+    
+    def stream_analysis(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict) -> Iterator[str]:
+        """
+        Stream the LLM analysis text chunk by chunk as it is generated.
+        Yields nothing when no API key is configured or there is nothing to analyse.
+        """
+        if not self.use_llm or not has_analysable_data(financial_data, metrics_results):
+            return
+        
+        stream = _get_sync_client(self.api_key).chat.completions.create(
+            model=self.model,
+            messages=self._create_messages(dataset_info, financial_data, metrics_results),
+            temperature=0.7,
+            max_tokens=1500,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _create_messages(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict,
+                         json_response: bool = False) -> List[Dict]:
+        """
+        Chat messages for the LLM call. The static instructions come first so every
+        request shares the same prefix, which the provider can serve from its prompt cache.
+        With json_response the model is asked for a JSON object instead of text sections.
+        """
+        static_prefix, dynamic_suffix = self._create_analysis_prompt(dataset_info, financial_data, metrics_results)
+        if json_response:
+            static_prefix = ANALYSIS_JSON_INSTRUCTIONS
+        return [
+            {"role": "system", "content": static_prefix},
+            {"role": "user", "content": dynamic_suffix}
+        ]
+    
+    def _create_analysis_prompt(self, dataset_info: Dict, financial_data: Dict, metrics_results: Dict) -> Tuple[str, str]:
+        """
+        Create a comprehensive prompt for LLM analysis.
+        Returns (static_prefix, dynamic_suffix): the fixed instructions and the per-dataset figures.
+        """
         prompt = f"""
-Analyze the following financial dataset and provide actionable insights:
-
 ## Dataset Information
 Business Type: {dataset_info.get('business_type', 'Unknown')}
 Total Records: {dataset_info.get('data_quality', {}).get('total_rows', 0)}
@@ -85,57 +368,44 @@ Completeness: {dataset_info.get('data_quality', {}).get('completeness', 0):.1f}%
                 else:
                     prompt += str(metric_data) + "\n"
         
-        prompt += """
-
-Please provide:
-1. **Key Insights**: 3-5 most important findings from this data
-2. **Strengths**: What the business is doing well
-3. **Concerns**: Areas that need attention or improvement
-4. **Recommendations**: Specific actionable steps to improve financial performance
-5. **Anomalies**: Any unusual patterns or outliers detected
-6. **Risk Assessment**: Potential financial risks
-7. **Growth Opportunities**: Areas for potential expansion or improvement
-
-Format your response in clear sections.
-"""
+        return ANALYSIS_INSTRUCTIONS, _compact_prompt(prompt)
+    
+    def _parse_json_response(self, response_text: str) -> Dict:
+        """
+        Read the sections from a JSON-mode response; anything that isn't a list
+        of strings is dropped. Falls back to the text parser if it isn't JSON.
+        """
+        try:
+            data = json.loads(response_text)
+        except ValueError:
+            return self._parse_llm_response(response_text)
+        if not isinstance(data, dict):
+            return self._parse_llm_response(response_text)
         
-        return prompt
+        sections = {}
+        for key in SECTION_KEYS:
+            items = data.get(key)
+            sections[key] = [str(item).strip() for item in items if item] if isinstance(items, list) else []
+        return sections
     
     def _parse_llm_response(self, response_text: str) -> Dict:
-        """Parse LLM response into structured format."""
-        sections = {
-            'key_insights': [],
-            'strengths': [],
-            'concerns': [],
-            'recommendations': [],
-            'anomalies': [],
-            'risks': [],
-            'opportunities': []
-        }
+        """Parse a free-text (streamed) LLM response into structured format."""
+        sections = {key: [] for key in SECTION_KEYS}
         
         # Simple parsing - split by sections
         current_section = None
-        for line in response_text.split('\n'):
+        for line in response_text.splitlines():
             line = line.strip()
             if not line:
                 continue
             
-            if 'key insight' in line.lower():
-                current_section = 'key_insights'
-            elif 'strength' in line.lower():
-                current_section = 'strengths'
-            elif 'concern' in line.lower():
-                current_section = 'concerns'
-            elif 'recommendation' in line.lower():
-                current_section = 'recommendations'
-            elif 'anomal' in line.lower():
-                current_section = 'anomalies'
-            elif 'risk' in line.lower():
-                current_section = 'risks'
-            elif 'opportunit' in line.lower() or 'growth' in line.lower():
-                current_section = 'opportunities'
-            elif current_section and (line.startswith('-') or line.startswith('•') or line[0].isdigit()):
-                sections[current_section].append(line.lstrip('- •0123456789.').strip())
+            header = next((key for key, regex in _SECTION_HEADERS if regex.search(line)), None)
+            if header:
+                current_section = header
+            elif current_section:
+                bullet = _BULLET_RE.match(line)
+                if bullet:
+                    sections[current_section].append(line[bullet.end():].strip())
         
         return sections
     
@@ -274,26 +544,31 @@ Format your response in clear sections.
         """
         anomalies = []
         
-        # Check for negative values where they shouldn't be
         if 'revenue' in financial_data:
-            if any(x < 0 for x in financial_data['revenue']['series']):
+            # One float64 array serves both scans below
+            series = np.asarray(financial_data['revenue']['series'], dtype=np.float64)
+            
+            # Check for negative values where they shouldn't be
+            if (series < 0).any():
                 anomalies.append({
                     'type': 'negative_revenue',
                     'severity': 'high',
                     'message': 'Detected negative revenue values - possible data error'
                 })
-        
-        # Check for extreme outliers
-        if 'revenue' in financial_data:
-            series = financial_data['revenue']['series']
-            mean_val = financial_data['revenue']['mean']
-            std_val = np.std(series)
-            outliers = [x for x in series if abs(x - mean_val) > 3 * std_val]
-            if outliers:
+            
+            # Check for extreme outliers; the deviations from the mean are computed once
+            # and give the standard deviation too (variance is shift-invariant)
+            num_outliers = 0
+            if series.size:
+                deviation = series - financial_data['revenue']['mean']
+                offset = deviation.mean()
+                std = np.sqrt(max(np.dot(deviation, deviation) / deviation.size - offset * offset, 0.0))
+                num_outliers = int(np.count_nonzero(np.abs(deviation) > 3 * std))
+            if num_outliers:
                 anomalies.append({
                     'type': 'revenue_outliers',
                     'severity': 'medium',
-                    'message': f'Detected {len(outliers)} extreme revenue outliers'
+                    'message': f'Detected {num_outliers} extreme revenue outliers'
                 })
         
         # Check for zero or very low profits
@@ -315,7 +590,53 @@ def generate_ai_insights(dataset_info: Dict, financial_data: Dict, metrics_resul
     """
     analyzer = LLMFinancialAnalyzer(api_key=api_key)
     insights = analyzer.analyze_dataset(dataset_info, financial_data, metrics_results)
-    
+    return _add_anomalies_and_suggestions(analyzer, insights, dataset_info, financial_data)
+
+
+def stream_ai_insights(dataset_info: Dict, financial_data: Dict, metrics_results: Dict, api_key: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream raw LLM analysis text for incremental display.
+    Pass the joined text to insights_from_text() once the stream ends.
+    """
+    analyzer = LLMFinancialAnalyzer(api_key=api_key)
+    return analyzer.stream_analysis(dataset_info, financial_data, metrics_results)
+
+
+def batch_stream(chunks: Iterator[str], interval: float = 0.05) -> Iterator[str]:
+    """
+    Coalesce streamed text so the UI re-renders at most every `interval` seconds
+    instead of once per token.
+    """
+    buffer = []
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        buffer.append(chunk)
+        now = time.monotonic()
+        if now - last_flush >= interval:
+            yield ''.join(buffer)
+            buffer.clear()
+            last_flush = now
+    if buffer:
+        yield ''.join(buffer)
+
+
+def insights_from_text(analysis_text: str, dataset_info: Dict, financial_data: Dict, api_key: Optional[str] = None) -> Dict:
+    """
+    Build the insights dict from a completed (streamed) LLM analysis.
+    """
+    analyzer = LLMFinancialAnalyzer(api_key=api_key)
+    insights = analyzer._parse_llm_response(analysis_text)
+    insights.update({
+        'raw_analysis': analysis_text,
+        'model_used': analyzer.model,
+        'source': 'llm'
+    })
+    return _add_anomalies_and_suggestions(analyzer, insights, dataset_info, financial_data)
+
+
+def _add_anomalies_and_suggestions(analyzer: LLMFinancialAnalyzer, insights: Dict,
+                                   dataset_info: Dict, financial_data: Dict) -> Dict:
+    """Attach anomaly detection and metric suggestions to an insights dict."""
     # Add anomaly detection
     if 'df' in dataset_info:
         insights['anomalies'] = analyzer.detect_anomalies(dataset_info['df'], financial_data)
@@ -23,13 +23,16 @@ OPENAI_API_KEY = "sk-your-key-here"
 # OPENAI_MODEL = "gpt-4"
 '''
 
-# Write with UTF-8 encoding (no BOM)
-with open(secrets_file, 'w', encoding='utf-8') as f:
-    f.write(secrets_content)
-
-print("✅ Created .streamlit/secrets.toml successfully!")
-print(f"📁 Location: {secrets_file.absolute()}")
-print("\n⚠️  IMPORTANT: Edit this file and replace 'sk-your-key-here' with your actual OpenAI API key")
+# Write with UTF-8 encoding (no BOM) and LF line endings; leave an existing file alone
+if secrets_file.exists():
+    print("✅ .streamlit/secrets.toml already exists - left unchanged")
+    print(f"📁 Location: {secrets_file.absolute()}")
+else:
+    secrets_file.write_text(secrets_content, encoding='utf-8', newline='\n')
+    
+    print("✅ Created .streamlit/secrets.toml successfully!")
+    print(f"📁 Location: {secrets_file.absolute()}")
+    print("\n⚠️  IMPORTANT: Edit this file and replace 'sk-your-key-here' with your actual OpenAI API key")
 print("\n📝 To edit:")
 print(f"   notepad {secrets_file}")
 print("\n🔒 This file is already in .gitignore - your API key is safe!")
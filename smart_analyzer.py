@@ -3,13 +3,118 @@ Smart Dataset Analyzer with LLM Integration
 Automatically detects dataset type and suggests relevant financial metrics
 """
 
+import copy
+import hashlib
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
+from functools import cached_property, lru_cache
 from typing import Dict, List, Tuple, Optional
+import json
 import re
 from datetime import datetime
 
 
+# Detected column types that extract_financial_data reads as numbers
+NUMERIC_FIELDS = ('revenue', 'cost', 'investment', 'cashflow', 'assets', 'liabilities', 'equity', 'quantity')
+
+
+# Substrings that identify each kind of financial column (matched on lowercased names)
+COLUMN_PATTERNS = {
+    'revenue': ['revenue', 'sales', 'income', 'total_amount', 'total amount', 'sales_amount'],
+    'cost': ['cost', 'expense', 'cogs', 'cost_of_goods', 'purchase', 'expenditure'],
+    'profit': ['profit', 'net_income', 'earnings', 'margin'],
+    'date': ['date', 'time', 'period', 'month', 'year', 'timestamp'],
+    'quantity': ['quantity', 'qty', 'units', 'volume', 'count'],
+    'price': ['price', 'unit_price', 'rate', 'cost_per_unit'],
+    'customer': ['customer', 'client', 'buyer', 'account'],
+    'product': ['product', 'item', 'sku', 'category', 'service'],
+    'investment': ['investment', 'capital', 'initial', 'principal'],
+    'cashflow': ['cash_flow', 'cashflow', 'cash'],
+    'assets': ['assets', 'inventory', 'stock'],
+    'liabilities': ['liabilities', 'debt', 'payable', 'loan'],
+    'equity': ['equity', 'capital', 'owner'],
+}
+# One alternation per key, so each column is tested with a single regex search
+COLUMN_REGEX = {key: re.compile('|'.join(map(re.escape, patterns))) for key, patterns in COLUMN_PATTERNS.items()}
+
+# Explicit formats tried on text date columns before falling back to per-value
+# parsing; month-first before day-first, as format='mixed' resolves ambiguous dates.
+# 'ISO8601' is pandas' vectorized parser for any ISO 8601 variant (mixed precision,
+# optional time), so ISO columns never need the per-value path.
+DATE_FORMATS = (
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', 'ISO8601',
+    '%m/%d/%Y', '%d/%m/%Y', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M',
+    '%d-%m-%Y', '%d-%b-%Y', '%d %b %Y', '%b %Y', '%b-%Y', '%Y-%m',
+)
+DATE_SAMPLE_SIZE = 100
+
+
+def detect_date_format(values: pd.Series) -> Optional[str]:
+    """First of DATE_FORMATS that parses every value in a sample of the column, or None."""
+    sample = values.dropna().head(DATE_SAMPLE_SIZE).astype(str)
+    if sample.empty:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            if pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+                return fmt
+        except ValueError:  # e.g. mixed UTC offsets
+            return None
+    return None
+
+
+def parse_dates_strict(values: pd.Series) -> Optional[pd.Series]:
+    """
+    The column parsed in one vectorized pass with the format detected from a
+    sample, or None if no DATE_FORMATS entry fits every value. Month names or
+    labels like 'Jan' are left to the caller instead of being guessed at.
+    """
+    fmt = detect_date_format(values)
+    if fmt is None:
+        return None
+    try:
+        return pd.to_datetime(values, format=fmt, errors='raise', cache=True)
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_dates(values: pd.Series, errors: str = 'coerce') -> pd.Series:
+    """
+    pd.to_datetime for a column of text dates. Columns with a detectable
+    format go through parse_dates_strict; the rest (mixed or unusual formats)
+    go through format='mixed', which parses value by value.
+    Non-text columns are passed to pd.to_datetime unchanged.
+    """
+    if values.dtype.kind not in 'OUST':
+        return pd.to_datetime(values, errors=errors)
+    parsed = parse_dates_strict(values)
+    if parsed is not None:
+        return parsed
+    return pd.to_datetime(values, format='mixed', errors=errors, cache=True)
+
+
+@lru_cache(maxsize=128)
+def _column_positions(columns: Tuple[str, ...], datetime_positions: frozenset = frozenset()) -> Tuple[Tuple[str, int], ...]:
+    """
+    (key, position) of the first column matching each COLUMN_PATTERNS key.
+    Datetime columns are never picked for the NUMERIC_FIELDS keys, as their
+    numeric value is an epoch count (e.g. 'Date of Sales Invoice' is not revenue).
+    Depends only on the lowercased column names and which columns are datetimes,
+    so a frame with the same header (a re-upload, a rerun, another analyzer)
+    skips the regex pass.
+    """
+    positions = []
+    for key, regex in COLUMN_REGEX.items():
+        skip = datetime_positions if key in NUMERIC_FIELDS else frozenset()
+        # First column (in frame order) containing any of the key's patterns
+        for idx, col in enumerate(columns):
+            if idx not in skip and regex.search(col):
+                positions.append((key, idx))
+                break
+    return tuple(positions)
+
+
 class SmartFinancialAnalyzer:
     """
     Intelligent analyzer that detects dataset structure and business type,
@@ -44,34 +149,31 @@ class SmartFinancialAnalyzer:
             'recommendations': self._generate_recommendations()
         }
     
+    def _numeric_columns(self) -> Dict[str, str]:
+        """Detected columns for the numeric financial fields, keyed by field."""
+        return {key: self.detected_columns[key] for key in NUMERIC_FIELDS if key in self.detected_columns}
+    
+    @cached_property
+    def numeric_view(self) -> pd.DataFrame:
+        """
+        The detected numeric financial columns, coerced with pd.to_numeric once
+        and shared by every later reader. Reset when columns are re-detected.
+        """
+        cols = list(dict.fromkeys(self._numeric_columns().values()))
+        frame = self.df[cols]
+        coerced = frame.apply(pd.to_numeric, errors='coerce')
+        # Datetimes are not amounts; pd.to_numeric would turn them into epoch nanoseconds
+        dates = frame.select_dtypes(include=['datetime', 'datetimetz']).columns
+        if len(dates):
+            coerced[dates] = np.nan
+        return coerced
+    
     def _detect_columns(self):
         """Detect and map common financial columns."""
-        column_patterns = {
-            'revenue': ['revenue', 'sales', 'income', 'total_amount', 'total amount', 'sales_amount'],
-            'cost': ['cost', 'expense', 'cogs', 'cost_of_goods', 'purchase', 'expenditure'],
-            'profit': ['profit', 'net_income', 'earnings', 'margin'],
-            'date': ['date', 'time', 'period', 'month', 'year', 'timestamp'],
-            'quantity': ['quantity', 'qty', 'units', 'volume', 'count'],
-            'price': ['price', 'unit_price', 'rate', 'cost_per_unit'],
-            'customer': ['customer', 'client', 'buyer', 'account'],
-            'product': ['product', 'item', 'sku', 'category', 'service'],
-            'investment': ['investment', 'capital', 'initial', 'principal'],
-            'cashflow': ['cash_flow', 'cashflow', 'cash'],
-            'assets': ['assets', 'inventory', 'stock'],
-            'liabilities': ['liabilities', 'debt', 'payable', 'loan'],
-            'equity': ['equity', 'capital', 'owner'],
-        }
-        
-        for key, patterns in column_patterns.items():
-            for col in self.columns:
-                for pattern in patterns:
-                    if pattern in col:
-                        # Find original column name (with proper case)
-                        original_col = self.df.columns[self.columns.index(col)]
-                        self.detected_columns[key] = original_col
-                        break
-                if key in self.detected_columns:
-                    break
+        self.__dict__.pop('numeric_view', None)
+        datetime_positions = frozenset(idx for idx, dtype in enumerate(self.df.dtypes) if dtype.kind == 'M')
+        for key, idx in _column_positions(tuple(self.columns), datetime_positions):
+            self.detected_columns[key] = self.df.columns[idx]
     
     def _detect_business_type(self):
         """Detect type of business based on columns."""
@@ -130,13 +232,18 @@ class SmartFinancialAnalyzer:
     
     def _assess_data_quality(self) -> Dict:
         """Assess data quality and completeness."""
+        # One NA mask for both the count and completeness; dtype kinds are read
+        # straight off df.dtypes (same columns select_dtypes would pick)
+        na_mask = self.df.isna().to_numpy()
+        missing = int(np.count_nonzero(na_mask))
+        dtypes = self.df.dtypes
         return {
             'total_rows': len(self.df),
             'total_columns': len(self.df.columns),
-            'missing_values': self.df.isnull().sum().sum(),
-            'numeric_columns': len(self.df.select_dtypes(include=[np.number]).columns),
-            'date_columns': len(self.df.select_dtypes(include=['datetime64']).columns),
-            'completeness': (1 - self.df.isnull().sum().sum() / (len(self.df) * len(self.df.columns))) * 100
+            'missing_values': missing,
+            'numeric_columns': sum(dtype.kind in 'iufcm' for dtype in dtypes),
+            'date_columns': sum(dtype.kind == 'M' and not isinstance(dtype, pd.DatetimeTZDtype) for dtype in dtypes),
+            'completeness': (1 - missing / na_mask.size) * 100 if na_mask.size else 100.0
         }
     
     def _generate_recommendations(self) -> List[str]:
@@ -176,42 +283,38 @@ class SmartFinancialAnalyzer:
         """Extract and prepare financial data for calculations."""
         data = {}
         
-        # Extract revenue
-        if 'revenue' in self.detected_columns:
-            rev_col = self.detected_columns['revenue']
-            # Ensure numeric only - convert if possible
-            try:
-                revenue_series = pd.to_numeric(self.df[rev_col], errors='coerce').dropna()
-                data['revenue'] = {
-                    'total': float(revenue_series.sum()),
-                    'mean': float(revenue_series.mean()),
-                    'series': revenue_series.tolist()
-                }
-            except Exception as e:
-                data['revenue'] = {
-                    'total': 0,
-                    'mean': 0,
-                    'series': [],
-                    'error': f"Could not process revenue column: {str(e)}"
-                }
-        
-        # Extract costs
-        if 'cost' in self.detected_columns:
-            cost_col = self.detected_columns['cost']
-            try:
-                cost_series = pd.to_numeric(self.df[cost_col], errors='coerce').dropna()
-                data['cost'] = {
-                    'total': float(cost_series.sum()),
-                    'mean': float(cost_series.mean()),
-                    'series': cost_series.tolist()
-                }
-            except Exception as e:
-                data['cost'] = {
-                    'total': 0,
-                    'mean': 0,
-                    'series': [],
-                    'error': f"Could not process cost column: {str(e)}"
-                }
+        # Aggregate every detected numeric column together on the shared coerced view
+        numeric_cols = self._numeric_columns()
+        try:
+            coerced = self.numeric_view
+            aggs = coerced.agg(['sum', 'mean'])
+            failure = None
+        except Exception as e:
+            failure = e
+        
+        def series(col):
+            return coerced[col].dropna().to_numpy(dtype=np.float64)
+        
+        def total(col):
+            return float(aggs.at['sum', col]) if failure is None else 0
+        
+        # Extract revenue and costs
+        for key in ('revenue', 'cost'):
+            if key in numeric_cols:
+                col = numeric_cols[key]
+                if failure is None:
+                    data[key] = {
+                        'total': total(col),
+                        'mean': float(aggs.at['mean', col]),
+                        'series': series(col)
+                    }
+                else:
+                    data[key] = {
+                        'total': 0,
+                        'mean': 0,
+                        'series': np.empty(0),
+                        'error': f"Could not process {key} column: {str(failure)}"
+                    }
         
         # Calculate profit if both revenue and cost exist
         if 'revenue' in data and 'cost' in data:
@@ -221,79 +324,56 @@ class SmartFinancialAnalyzer:
             }
         
         # Extract investment data
-        if 'investment' in self.detected_columns:
-            inv_col = self.detected_columns['investment']
-            try:
-                investment_series = pd.to_numeric(self.df[inv_col], errors='coerce').dropna()
-                data['investment'] = float(investment_series.sum())
-            except:
-                data['investment'] = 0
+        if 'investment' in numeric_cols:
+            data['investment'] = total(numeric_cols['investment'])
         
         # Extract cash flows
-        if 'cashflow' in self.detected_columns:
-            cf_col = self.detected_columns['cashflow']
-            try:
-                cashflow_series = pd.to_numeric(self.df[cf_col], errors='coerce').dropna()
-                data['cashflows'] = cashflow_series.tolist()
-            except:
-                data['cashflows'] = []
+        if 'cashflow' in numeric_cols:
+            data['cashflows'] = series(numeric_cols['cashflow']) if failure is None else np.empty(0)
         elif 'revenue' in data and 'cost' in data and 'error' not in data['revenue'] and 'error' not in data['cost']:
             # Generate cash flows from revenue and cost
-            try:
-                min_len = min(len(data['revenue']['series']), len(data['cost']['series']))
-                data['cashflows'] = [
-                    data['revenue']['series'][i] - data['cost']['series'][i] 
-                    for i in range(min_len)
-                ]
-            except:
-                data['cashflows'] = []
+            rev_arr = data['revenue']['series']
+            cost_arr = data['cost']['series']
+            min_len = min(rev_arr.size, cost_arr.size)
+            data['cashflows'] = rev_arr[:min_len] - cost_arr[:min_len]
         
         # Extract time series data
         if 'date' in self.detected_columns:
             date_col = self.detected_columns['date']
             try:
-                data['dates'] = pd.to_datetime(self.df[date_col])
+                data['dates'] = parse_dates(self.df[date_col], errors='raise')
             except:
                 data['dates'] = None
         
-        # Extract assets and liabilities
-        if 'assets' in self.detected_columns:
-            try:
-                assets_series = pd.to_numeric(self.df[self.detected_columns['assets']], errors='coerce').dropna()
-                data['assets'] = float(assets_series.sum())
-            except:
-                data['assets'] = 0
-        
-        if 'liabilities' in self.detected_columns:
-            try:
-                liabilities_series = pd.to_numeric(self.df[self.detected_columns['liabilities']], errors='coerce').dropna()
-                data['liabilities'] = float(liabilities_series.sum())
-            except:
-                data['liabilities'] = 0
-        
-        if 'equity' in self.detected_columns:
-            try:
-                equity_series = pd.to_numeric(self.df[self.detected_columns['equity']], errors='coerce').dropna()
-                data['equity'] = float(equity_series.sum())
-            except:
-                data['equity'] = 0
+        # Extract assets, liabilities and equity
+        for key in ('assets', 'liabilities', 'equity'):
+            if key in numeric_cols:
+                data[key] = total(numeric_cols[key])
         
         # Extract quantity data
-        if 'quantity' in self.detected_columns:
-            qty_col = self.detected_columns['quantity']
-            try:
-                qty_series = pd.to_numeric(self.df[qty_col], errors='coerce').dropna()
+        if 'quantity' in numeric_cols:
+            col = numeric_cols['quantity']
+            if failure is None:
                 data['quantity'] = {
-                    'total': float(qty_series.sum()),
-                    'mean': float(qty_series.mean())
+                    'total': total(col),
+                    'mean': float(aggs.at['mean', col])
                 }
-            except:
+            else:
                 data['quantity'] = {'total': 0, 'mean': 0}
         
         return data
     
     def generate_llm_prompt(self) -> str:
         """Generate a prompt for LLM analysis."""
+        # Compact JSON instead of aligned text tables; statistics cover the
+        # detected numeric financial columns only (IDs and free text add nothing)
+        stats_cols = list(dict.fromkeys(
+            col for key, col in self.detected_columns.items() if key in NUMERIC_FIELDS
+        ))
+        stats = (self.df[stats_cols] if stats_cols else self.df).describe().round(2)
+        preview = self.df.head(10).to_json(orient='split', index=False, date_format='iso', date_unit='s')
+        summary = json.dumps(stats.to_dict(), separators=(',', ':'), default=str)
+        
         prompt = f"""
 Analyze this financial dataset:
 
@@ -301,11 +381,11 @@ Business Type: {self.business_type}
 Total Records: {len(self.df)}
 Columns Detected: {', '.join(self.detected_columns.keys())}
 
-Dataset Preview:
-{self.df.head(10).to_string()}
+Dataset Preview (JSON, columns + rows):
+{preview}
 
-Summary Statistics:
-{self.df.describe().to_string()}
+Summary Statistics (JSON):
+{summary}
 
 Available Metrics: {', '.join(self.metrics_available)}
 
@@ -319,16 +399,48 @@ Please provide:
         return prompt
 
 
+# Recent auto_detect_and_calculate results keyed by frame_fingerprint (outside
+# Streamlit there is no st.cache_data, so repeat calls are memoized here)
+_ANALYSIS_CACHE_SIZE = 32
+_analysis_cache = OrderedDict()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> Tuple:
+    """
+    Content key for a DataFrame: shape, column names, dtypes and a digest of
+    the per-row hashes in row order (a reordered frame gets a different key).
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return (df.shape, tuple(map(str, df.columns)), tuple(map(str, df.dtypes)),
+            hashlib.blake2b(row_hashes.tobytes()).digest())
+
+
 def auto_detect_and_calculate(df: pd.DataFrame) -> Dict:
     """
     Main function to automatically detect dataset type and calculate metrics.
+    Results for an unchanged DataFrame are reused (a deep copy is returned).
     """
+    try:
+        key = frame_fingerprint(df)
+    except TypeError:  # unhashable cell values (lists, dicts)
+        key = None
+    
+    if key is not None and key in _analysis_cache:
+        _analysis_cache.move_to_end(key)
+        return copy.deepcopy(_analysis_cache[key])
+    
     analyzer = SmartFinancialAnalyzer(df)
     analysis_result = analyzer.analyze_dataset()
     financial_data = analyzer.extract_financial_data()
     
-    return {
+    result = {
         'analysis': analysis_result,
         'financial_data': financial_data,
         'llm_prompt': analyzer.generate_llm_prompt()
     }
+    
+    if key is not None:
+        _analysis_cache[key] = copy.deepcopy(result)
+        if len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return result
@@ -3,10 +3,23 @@ Test Script - Verify All Fixes Work
 Run this to confirm datetime error is fixed and everything works
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from smart_analyzer import SmartFinancialAnalyzer, auto_detect_and_calculate, parse_dates_strict
+from advanced_calculator import AdvancedFinancialCalculator
+from forecasting_module import FinancialForecaster
+from llm_integration import LLMFinancialAnalyzer
+
+# One calculator shared by every test below
+calc = AdvancedFinancialCalculator()
+
+# Shared daily dates for the datetime-column tests; the tests only need a
+# datetime64 column, not DatetimeIndex features
+DATES = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-11')).astype('datetime64[ns]')
+
 print("=" * 60)
 print("🧪 TESTING ALL FIXES")
 print("=" * 60)
@@ -14,11 +27,9 @@ print("=" * 60)
 # Test 1: DateTime Handling
 print("\n✅ Test 1: DateTime Column Handling")
 try:
-    from smart_analyzer import SmartFinancialAnalyzer
-    
     # Create dataset with datetime
     df = pd.DataFrame({
-        'Date': pd.date_range('2024-01-01', periods=10),
+        'Date': DATES,
         'Revenue': [10000, 12000, 11000, 13000, 14000, 15000, 16000, 14000, 15000, 17000],
         'Cost': [6000, 7000, 6500, 7500, 8000, 8500, 9000, 8000, 8500, 9500]
     })
@@ -46,9 +57,6 @@ except Exception as e:
 # Test 2: NPV Calculation
 print("\n✅ Test 2: NPV Calculation (Fixed)")
 try:
-    from advanced_calculator import AdvancedFinancialCalculator
-    
-    calc = AdvancedFinancialCalculator()
     cashflows = [-100000, 30000, 40000, 50000, 40000]
     
     result = calc.calculate_npv_fixed(cashflows, 0.10)
@@ -103,7 +111,7 @@ print("\n✅ Test 5: Mixed Data Types Handling")
 try:
     df_mixed = pd.DataFrame({
         'ID': ['A001', 'A002', 'A003'],
-        'Date': pd.date_range('2024-01-01', periods=3),
+        'Date': DATES[:3],
         'Product': ['Book', 'Laptop', 'Phone'],
         'Sales': [500, 1200, 800],
         'Cost': [300, 700, 500],
@@ -126,11 +134,12 @@ except Exception as e:
 # Test 6: All Metrics Calculation
 print("\n✅ Test 6: All Metrics Calculation")
 try:
+    # float64 arrays, the same shape extract_financial_data hands the calculator
     test_data = {
-        'revenue': {'total': 500000, 'mean': 50000, 'series': [50000]*10},
-        'cost': {'total': 350000, 'mean': 35000, 'series': [35000]*10},
+        'revenue': {'total': 500000, 'mean': 50000, 'series': np.full(10, 50000.0)},
+        'cost': {'total': 350000, 'mean': 35000, 'series': np.full(10, 35000.0)},
         'investment': 100000,
-        'cashflows': [-100000, 30000, 40000, 50000, 40000],
+        'cashflows': np.array([-100000, 30000, 40000, 50000, 40000], dtype=np.float64),
         'assets': 200000,
         'liabilities': 80000,
         'equity': 120000
@@ -150,8 +159,6 @@ except Exception as e:
 # Test 7: OpenAI API Key Loading (without actual API call)
 print("\n✅ Test 7: API Key Configuration")
 try:
-    import os
-    
     # Test environment variable
     test_key = "sk-test-key-for-verification"
     os.environ['OPENAI_API_KEY'] = test_key
@@ -178,6 +185,11 @@ try:
     assert 'error' in result, "Should return error for empty cashflows"
     print(f"   ✅ Empty data handling: Working")
     
+    # Test invalid discount rate and non-numeric cash flows
+    assert 'error' in calc.calculate_npv_fixed(cashflows, -1), "Should return error for a -100% discount rate"
+    assert 'error' in calc.calculate_npv_fixed(['n/a', 100], 0.10), "Should return error for non-numeric cash flows"
+    print(f"   ✅ Invalid rate / non-numeric cash flows: Working")
+    
     # Test with invalid data
     result = calc.calculate_irr_fixed([0, 0, 0])
     # Should either work or return error, not crash
@@ -192,6 +204,199 @@ except Exception as e:
     print(f"   ❌ FAILED: {str(e)}")
     exit(1)
 
+# Test 9: Batch Metrics
+print("\n✅ Test 9: Batch Metrics (Vectorized)")
+try:
+    deals = pd.DataFrame({
+        'revenue': [500000, 0, 120000],
+        'cost': [350000, 100, 90000],
+        'investment': [100000, 50000, 0],
+        'assets': [200000, 10000, 50000],
+        'liabilities': [80000, 5000, 0],
+        'equity': [120000, 0, 40000]
+    })
+    
+    batch = calc.calculate_all_metrics_batch(deals)
+    assert len(batch) == len(deals), "Batch should return one row per deal"
+    
+    # Scalar results for every deal, then one array comparison per metric
+    singles = [
+        calc.calculate_all_metrics({
+            'revenue': {'total': row['revenue']},
+            'cost': {'total': row['cost']},
+            'investment': row['investment'],
+            'assets': row['assets'],
+            'liabilities': row['liabilities'],
+            'equity': row['equity']
+        })
+        for _, row in deals.iterrows()
+    ]
+    expected = {
+        'profit_loss_ratio': [s['profit_loss']['profit_loss_ratio'] for s in singles],
+        'roi': [s['roi']['roi'] for s in singles],
+        'current_ratio': [s['working_capital']['current_ratio'] for s in singles],
+        'debt_to_equity': [s['debt_to_equity']['debt_to_equity'] for s in singles],
+        # NaN where the scalar version returns an error
+        'wacc': [s['wacc'].get('wacc', np.nan) for s in singles],
+    }
+    for metric, values in expected.items():
+        np.testing.assert_allclose(batch[metric], values, rtol=1e-9, equal_nan=True,
+                                   err_msg=f"{metric} differs from calculate_all_metrics")
+    
+    print(f"   ✅ {len(batch)} deals, {len(batch.columns)} metrics per deal")
+    print(f"   ✅ Matches per-row calculate_all_metrics")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 10: Batch Revenue Forecast
+print("\n✅ Test 10: Batch Revenue Forecast")
+try:
+    sales = pd.DataFrame({
+        'Store_A': [10000, 12000, 11000, 13000, 14000, 15000, 16000, 14000, 15000, 17000],
+        'Store_B': [8000, 7500, 7000, 7200, 6800, 6500, 6400, 6000, 5900, 5600],
+        'Store_C': [5000, None, 5200, 5400, 5300, 5600, 5800, 5700, 6000, 6100]
+    })
+    
+    batch = FinancialForecaster.forecast_revenue_batch(sales, list(sales.columns), periods=6)
+    
+    for col in sales.columns:
+        single = FinancialForecaster.forecast_revenue(sales, col, periods=6)
+        assert np.allclose(batch[col]['forecasts'], single['forecasts']), f"{col} forecasts differ"
+        assert np.isclose(batch[col]['trend'], single['trend']), f"{col} trend differs"
+        assert np.allclose(batch[col]['upper_bound'], single['upper_bound']), f"{col} bounds differ"
+    
+    print(f"   ✅ {len(batch)} series forecast in one call")
+    print(f"   ✅ Store_A trend: {batch['Store_A']['trend_direction']}, Store_B trend: {batch['Store_B']['trend_direction']}")
+    print(f"   ✅ Matches per-column forecast_revenue")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 11: NPV Profile
+print("\n✅ Test 11: NPV Profile (Many Discount Rates)")
+try:
+    rates = [0.0, 0.05, 0.10, 0.15, 0.20]
+    profile = calc.calculate_npv_profile(cashflows, rates)
+    
+    assert 'error' not in profile, f"NPV profile error: {profile.get('error')}"
+    np.testing.assert_allclose(profile['npv'], [calc.calculate_npv_fixed(cashflows, rate)['npv'] for rate in rates],
+                               err_msg="NPV profile differs from calculate_npv_fixed")
+    
+    print(f"   ✅ {len(rates)} rates in one call, NPV at 10%: ${profile['npv'][2]:,.2f}")
+    print(f"   ✅ Matches per-rate calculate_npv_fixed")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 12: Analysis cache respects row order
+print("\n✅ Test 12: Analysis Cache Keyed on Row Order")
+try:
+    ordered = pd.DataFrame({'Revenue': [100.0, 50.0, 300.0, 80.0], 'Cost': [90.0, 20.0, 100.0, 10.0]})
+    reordered = ordered.iloc[::-1].reset_index(drop=True)
+    
+    first = auto_detect_and_calculate(ordered)['financial_data']['cashflows']
+    second = auto_detect_and_calculate(reordered)['financial_data']['cashflows']
+    
+    assert np.array_equal(second, first[::-1]), "Reordered rows returned the cached result for the old order"
+    print(f"   ✅ Cash flows follow the new row order: {second.tolist()}")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 13: Date columns are never read as amounts
+print("\n✅ Test 13: Date Column Named Like Revenue/Cost")
+try:
+    df_dates = pd.DataFrame({
+        'Sales Date': DATES[:4],
+        'Purchase Date': DATES[:4],
+        'Sales Amount': [1000.0, 1200.0, 900.0, 1100.0],
+        'Cost': [600.0, 700.0, 500.0, 650.0]
+    })
+    
+    analyzer = SmartFinancialAnalyzer(df_dates)
+    analyzer.analyze_dataset()
+    financial_data = analyzer.extract_financial_data()
+    
+    assert analyzer.detected_columns['revenue'] == 'Sales Amount', f"Revenue mapped to {analyzer.detected_columns['revenue']}"
+    assert analyzer.detected_columns['cost'] == 'Cost', f"Cost mapped to {analyzer.detected_columns['cost']}"
+    assert financial_data['revenue']['total'] == 4200.0, "Revenue total includes date values"
+    print(f"   ✅ Revenue: {analyzer.detected_columns['revenue']}, Cost: {analyzer.detected_columns['cost']}")
+    print(f"   ✅ Revenue Total: ${financial_data['revenue']['total']:,.2f}")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 14: Long mixed-sign series only report a rate that zeroes the NPV
+print("\n✅ Test 14: IRR on a Long Mixed-Sign Series")
+try:
+    rng = np.random.default_rng(0)
+    checked = 0
+    for _ in range(20):
+        daily = rng.uniform(800, 1200, 365) - rng.uniform(800, 1200, 365)
+        irr_result = calc.calculate_irr_fixed(daily.tolist())
+        if 'error' in irr_result:
+            continue
+        residual = calc.calculate_npv_fixed(daily.tolist(), irr_result['irr'])['npv']
+        assert abs(residual) <= 1e-6 * np.abs(daily).sum(), f"IRR {irr_result['irr']:.4f} leaves NPV {residual:.3g}"
+        checked += 1
+    print(f"   ✅ {checked}/20 series returned an IRR with NPV ≈ 0, the rest an error")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 15: Month-name columns are not turned into dates
+print("\n✅ Test 15: Month-Name Column Stays Text")
+try:
+    df_months = pd.DataFrame({
+        'Month': ['Jan', 'Feb', 'Mar'],
+        'Date': ['2024-01-31', '2024-02-29', '2024-03-31'],
+        'Revenue': [1000.0, 1200.0, 900.0]
+    })
+    
+    assert parse_dates_strict(df_months['Month']) is None, "Month names were parsed as dates"
+    parsed = parse_dates_strict(df_months['Date'])
+    assert parsed is not None and parsed.dt.month.tolist() == [1, 2, 3], "ISO dates were not parsed"
+    
+    analyzer = SmartFinancialAnalyzer(df_months)
+    analyzer.analyze_dataset()
+    analyzer.extract_financial_data()
+    assert df_months['Month'].tolist() == ['Jan', 'Feb', 'Mar'], "Month column was modified"
+    print(f"   ✅ Month column kept as {df_months['Month'].tolist()}")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
+# Test 16: Headings naming two sections go to the first one in priority order
+print("\n✅ Test 16: LLM Response Section Headings")
+try:
+    response = (
+        "Growth risks:\n"
+        "- Customer concentration\n"
+        "Recommendations for strengths:\n"
+        "1. Strong gross margin\n"
+        "Opportunities:\n"
+        "- New markets\n"
+    )
+    sections = LLMFinancialAnalyzer(api_key=None)._parse_llm_response(response)
+    
+    assert sections['risks'] == ['Customer concentration'], f"Risks: {sections['risks']}"
+    assert sections['strengths'] == ['Strong gross margin'], f"Strengths: {sections['strengths']}"
+    assert sections['opportunities'] == ['New markets'], f"Opportunities: {sections['opportunities']}"
+    assert not sections['recommendations'], f"Recommendations: {sections['recommendations']}"
+    print(f"   ✅ Risks: {sections['risks']}, Strengths: {sections['strengths']}")
+    
+except Exception as e:
+    print(f"   ❌ FAILED: {str(e)}")
+    exit(1)
+
 # Final Summary
 print("\n" + "=" * 60)
 print("🎉 ALL TESTS PASSED!")
@@ -2,6 +2,7 @@
 Quick test to verify WACC calculation is working
 """
 
+import numpy as np
 from advanced_calculator import AdvancedFinancialCalculator
 
 # Test WACC calculation
@@ -65,6 +66,23 @@ print("   Equity, Liabilities, Revenue, Cost")
 print("   500000, 300000, 1000000, 600000")
 print("\nWhen uploaded, WACC should calculate to ~9.15%")
 
+# Test 4: Sensitivity grid (array inputs broadcast in one call)
+print("\n\nTest 4: WACC Sensitivity Grid")
+print("-" * 70)
+costs_of_equity = np.array([0.10, 0.12, 0.14])[:, None]
+tax_rates = np.array([0.25, 0.30])
+grid = calc.calculate_wacc(500000, 300000, costs_of_equity, 0.06, tax_rates)
+
+matches = all(
+    np.isclose(grid['wacc'][i, j], calc.calculate_wacc(500000, 300000, coe, 0.06, tax)['wacc'])
+    for i, coe in enumerate(costs_of_equity[:, 0]) for j, tax in enumerate(tax_rates)
+)
+if matches:
+    print(f"✅ {grid['wacc'].size} scenarios in one call, WACC range "
+          f"{grid['wacc_percentage'].min():.2f}% - {grid['wacc_percentage'].max():.2f}%")
+else:
+    print("❌ ERROR: grid WACC differs from scalar calculate_wacc")
+
 print("\n" + "=" * 70)
 print("✅ WACC TESTING COMPLETE")
 print("=" * 70)